@@ -25,6 +25,8 @@ Provides REST API for RAG evaluation functionality including:
 - Configuration recommendations
 """
 
+import itertools
+
 from quart import request, Response
 from api.apps import login_required, current_user
 from api.db.services.evaluation_service import EvaluationService
@@ -478,15 +480,20 @@ async def export_results(run_id):
         format_type = request.args.get("format", "json")
 
         if format_type.lower() == "csv":
-            csv_data = EvaluationService.get_run_results_csv(run_id)
-            if not csv_data:
+            # Stream the rows instead of building the whole CSV in memory
+            csv_data = EvaluationService.iter_run_results_csv(run_id)
+            if csv_data is None:
                 return get_data_error_result(message="Evaluation run not found or failed to generate CSV", code=RetCode.DATA_ERROR)
 
+            # Produce the first chunk here so query failures still get an error response
+            first_chunk = next(csv_data)
+
             safe_run_id = "".join(c for c in run_id if c.isalnum() or c in ("-", "_"))
             if not safe_run_id:
                 safe_run_id = "unknown"
 
-            return Response(csv_data, headers={"Content-Type": "text/csv; charset=utf-8", "Content-Disposition": f"attachment; filename=evaluation_run_{safe_run_id}.csv"})
+            body = (chunk.encode("utf-8") for chunk in itertools.chain((first_chunk,), csv_data))
+            return Response(body, headers={"Content-Type": "text/csv; charset=utf-8", "Content-Disposition": f"attachment; filename=evaluation_run_{safe_run_id}.csv"})
 
         success, result = EvaluationService.get_run_results(run_id)
 
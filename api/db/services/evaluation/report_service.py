@@ -16,12 +16,13 @@
 
 
 import csv
+import functools
 import io
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Set, Tuple
 
-from api.db.db_models import EvaluationRun, EvaluationResult, EvaluationCase
+from api.db.db_models import DB, EvaluationRun, EvaluationResult, EvaluationCase
 
 
 def sanitize_csv_cell(value: str) -> str:
@@ -38,6 +39,16 @@ def sanitize_csv_cell(value: str) -> str:
     return value
 
 
+# Runs that no longer receive results, so their metric keys are safe to cache
+_FINISHED_RUN_STATUSES = frozenset({"COMPLETED", "PARTIAL", "FAILED"})
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_metric_keys(run_id: str, version: Tuple[Any, ...]) -> Tuple[str, ...]:
+    """Sorted metric keys of a finished run; version changes whenever the run row is updated."""
+    return tuple(sorted(EvaluationReportService._metric_keys_for_run(run_id)))
+
+
 class EvaluationReportService:
     @classmethod
     def get_run_results(cls, run_id: str) -> Tuple[bool, Dict[str, Any] | str]:
@@ -59,70 +70,154 @@ class EvaluationReportService:
         """
         Get evaluation results as a CSV string.
         """
+        chunks = cls.iter_run_results_csv(run_id)
+        if chunks is None:
+            return None
+        try:
+            return "".join(chunks)
+        except Exception as e:
+            logging.error(f"Error generating CSV for run {run_id}: {e}")
+            return None
+
+    @classmethod
+    def iter_run_results_csv(cls, run_id: str, chunk_rows: int = 1000) -> Optional[Iterator[str]]:
+        """
+        Stream evaluation results as CSV text.
+
+        The run and the metric columns are resolved up front; None is returned if the
+        run does not exist. The returned generator yields one string per chunk_rows
+        result rows, the first one prefixed with the header. Results are fetched one
+        chunk at a time with keyset pagination, so memory stays bounded by a single
+        chunk. Errors while streaming are logged and re-raised.
+        """
         try:
-            # Verify run exists
             run = EvaluationRun.get_by_id(run_id)
             if not run:
                 return None
 
-            # Query results joined with case info
-            query = (
-                EvaluationResult.select(EvaluationResult, EvaluationCase)
-                .join(EvaluationCase, on=(EvaluationResult.case_id == EvaluationCase.id))
-                .where(EvaluationResult.run_id == run_id)
-                .order_by(EvaluationResult.create_time)
-            )
-
-            # Materialize results to avoid re-executing query
-            results_cache = list(query)
-
-            # First pass: identify all metric keys
-            all_metric_keys = set()
-            for result in results_cache:
-                metrics = result.to_dict().get("metrics", {})
-                if metrics:
-                    for k in metrics.keys():
-                        all_metric_keys.add(f"metric_{k}")
-
-            # Define CSV fields
-            fieldnames = ["Question", "Reference Answer", "Generated Answer", "Execution Time"]
-            fieldnames.extend(sorted(list(all_metric_keys)))
-            fieldnames.extend(["Retrieved Chunks", "Relevant Chunk IDs"])
-
-            # Generate CSV with streaming
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Second pass: use cached results
-            for result in results_cache:
-                result_dict = result.to_dict()
-                case_dict = result.case_id.to_dict()
-
-                # Sanitize user-controlled fields
-                row = {
-                    "Question": sanitize_csv_cell(case_dict.get("question", "")),
-                    "Reference Answer": sanitize_csv_cell(case_dict.get("reference_answer", "")),
-                    "Generated Answer": sanitize_csv_cell(result_dict.get("generated_answer", "")),
-                    "Execution Time": result_dict.get("execution_time", 0),
-                    "Retrieved Chunks": sanitize_csv_cell(json.dumps(result_dict.get("retrieved_chunks", []), ensure_ascii=False)),
-                    "Relevant Chunk IDs": sanitize_csv_cell(json.dumps(case_dict.get("relevant_chunk_ids", []), ensure_ascii=False)),
-                }
-
-                # Handle metrics
-                metrics = result_dict.get("metrics", {})
-                if metrics:
-                    for k, v in metrics.items():
-                        row[f"metric_{k}"] = sanitize_csv_cell(str(v))
-
-                writer.writerow(row)
-
-            return output.getvalue()
-
+            # Metric columns are fixed before streaming so the header is stable
+            if run.status in _FINISHED_RUN_STATUSES:
+                metric_keys = _cached_metric_keys(run_id, (run.update_time, run.status, run.complete_time))
+            else:
+                metric_keys = sorted(cls._metric_keys_for_run(run_id))
         except Exception as e:
             logging.error(f"Error generating CSV for run {run_id}: {e}")
             return None
 
+        return cls._iter_csv_chunks(run_id, metric_keys, chunk_rows)
+
+    @classmethod
+    def _metric_keys_for_run(cls, run_id: str) -> Set[str]:
+        """
+        Distinct metric names recorded across a run's results.
+
+        PostgreSQL computes the union itself; other databases read only the metrics
+        column and merge the keys in Python.
+        """
+        from common import settings
+
+        if (settings.DATABASE_TYPE or "").lower() == "postgres":
+            # metrics is a text-backed JSONField, so cast it before extracting keys
+            table = EvaluationResult._meta.table_name
+            metrics_column = EvaluationResult.metrics.column_name
+            run_column = EvaluationResult.run_id.column_name
+            cursor = DB.execute_sql(
+                f"SELECT DISTINCT jsonb_object_keys({metrics_column}::jsonb) FROM {table} WHERE {run_column} = %s AND jsonb_typeof({metrics_column}::jsonb) = 'object'",
+                (run_id,),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+        metric_keys = set()
+        metrics_query = EvaluationResult.select(EvaluationResult.metrics).where(EvaluationResult.run_id == run_id)
+        for result in metrics_query.iterator():
+            if result.metrics:
+                metric_keys.update(result.metrics.keys())
+        return metric_keys
+
+    @classmethod
+    def _iter_csv_chunks(cls, run_id: str, metric_keys: Sequence[str], chunk_rows: int) -> Iterator[str]:
+        """
+        Yield the CSV in chunks of chunk_rows result rows.
+
+        The header goes out with the first chunk, so advancing the generator once
+        runs the first query and surfaces early failures to the caller. Each page
+        is fetched on its own DB connection, since a streamed response body is
+        consumed in worker threads after the request has been torn down.
+        """
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # Rows are written positionally in this column order
+            writer.writerow(
+                [
+                    "Question",
+                    "Reference Answer",
+                    "Generated Answer",
+                    "Execution Time",
+                    *(f"metric_{k}" for k in metric_keys),
+                    "Retrieved Chunks",
+                    "Relevant Chunk IDs",
+                ]
+            )
+
+            # Second pass: results joined with case info, paged on (create_time, id)
+            after = None
+            while True:
+                query = (
+                    EvaluationResult.select(
+                        EvaluationResult.id,
+                        EvaluationResult.create_time,
+                        EvaluationResult.generated_answer,
+                        EvaluationResult.execution_time,
+                        EvaluationResult.retrieved_chunks,
+                        EvaluationResult.metrics,
+                        EvaluationCase.question,
+                        EvaluationCase.reference_answer,
+                        EvaluationCase.relevant_chunk_ids,
+                    )
+                    .join(EvaluationCase, on=(EvaluationResult.case_id == EvaluationCase.id))
+                    .where(EvaluationResult.run_id == run_id)
+                )
+                if after is not None:
+                    last_time, last_id = after
+                    query = query.where((EvaluationResult.create_time > last_time) | ((EvaluationResult.create_time == last_time) & (EvaluationResult.id > last_id)))
+                query = query.order_by(EvaluationResult.create_time, EvaluationResult.id).limit(chunk_rows).dicts()
+
+                with DB.connection_context():
+                    page = list(query.iterator())
+
+                # Rows are handed to the writer in batches so the C writer loops over them
+                writer.writerows([cls._csv_row(result, metric_keys) for result in page])
+                if len(page) < chunk_rows:
+                    # The header alone is still sent for a run without results
+                    if buffer.tell():
+                        yield buffer.getvalue()
+                    return
+
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                after = (page[-1]["create_time"], page[-1]["id"])
+        except Exception:
+            logging.exception(f"Error generating CSV for run {run_id}")
+            raise
+
+    @staticmethod
+    def _csv_row(result: Dict[str, Any], metric_keys: Sequence[str]) -> Tuple[Any, ...]:
+        """One CSV row, in header order, for a result joined with its case."""
+        # Metric keys that appeared after the header was fixed are left out
+        metrics = result.get("metrics") or {}
+        # Sanitize user-controlled fields
+        return (
+            sanitize_csv_cell(result.get("question", "")),
+            sanitize_csv_cell(result.get("reference_answer", "")),
+            sanitize_csv_cell(result.get("generated_answer", "")),
+            result.get("execution_time", 0),
+            *(sanitize_csv_cell(str(metrics[k])) if k in metrics else "" for k in metric_keys),
+            sanitize_csv_cell(json.dumps(result.get("retrieved_chunks", []), ensure_ascii=False)),
+            sanitize_csv_cell(json.dumps(result.get("relevant_chunk_ids", []), ensure_ascii=False)),
+        )
+
     @classmethod
     def get_recommendations(cls, run_id: str) -> Tuple[bool, List[Dict[str, Any]] | str]:
         """
@@ -187,16 +282,19 @@ class EvaluationReportService:
         Compare multiple evaluation runs.
         """
         try:
-            # Fetch runs
-            runs_query = list(EvaluationRun.select().where(EvaluationRun.id.in_(run_ids)))
-            runs_map = {r.id: r for r in runs_query}
+            # Fetch runs as plain dicts (the same shape as to_dict()), skipping peewee's row cache
+            runs_query = EvaluationRun.select().where(EvaluationRun.id.in_(run_ids)).dicts()
+            runs_map = {r["id"]: r for r in runs_query.iterator()}
 
-            # Reorder according to input run_ids
+            # Reorder according to input run_ids, noting each run's dataset on the way
             runs = []
             missing_ids = []
+            dataset_ids = set()
             for rid in run_ids:
                 if rid in runs_map:
-                    runs.append(runs_map[rid])
+                    run = runs_map[rid]
+                    runs.append(run)
+                    dataset_ids.add(run["dataset_id"])
                 elif rid not in missing_ids:  # Avoid duplicates in missing list
                     missing_ids.append(rid)
 
@@ -204,27 +302,19 @@ class EvaluationReportService:
                 return False, f"Runs not found: {', '.join(missing_ids)}"
 
             # Check if all runs belong to the same dataset
-            dataset_ids = {r.dataset_id_id for r in runs}
             if len(dataset_ids) > 1:
                 return False, "Cannot compare runs from different datasets"
 
-            # Prepare result structure
-            run_details = [r.to_dict() for r in runs]
-            comparison = {}
-
-            # Pivot metrics
-            all_metric_keys = set()
+            # Pivot metrics in a single pass: comparison[metric][run_id] = value
+            comparison: Dict[str, Dict[str, Any]] = {}
             for run in runs:
-                if run.metrics_summary:
-                    all_metric_keys.update(run.metrics_summary.keys())
-
-            for key in all_metric_keys:
-                comparison[key] = {}
-                for run in runs:
-                    if run.metrics_summary and key in run.metrics_summary:
-                        comparison[key][run.id] = run.metrics_summary[key]
+                for key, value in (run["metrics_summary"] or {}).items():
+                    bucket = comparison.get(key)
+                    if bucket is None:
+                        comparison[key] = bucket = {}
+                    bucket[run["id"]] = value
 
-            return True, {"runs": run_details, "comparison": comparison}
+            return True, {"runs": runs, "comparison": comparison}
 
         except Exception as e:
             logging.error(f"Error comparing runs: {e}")
@@ -25,7 +25,7 @@ Provides functionality for evaluating RAG system performance including:
 - Configuration recommendations
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 
 from api.db.services.common_service import CommonService
 from api.db.db_models import EvaluationDataset
@@ -119,6 +119,10 @@ class EvaluationService(CommonService):
     def get_run_results_csv(cls, run_id: str) -> Optional[str]:
         return EvaluationReportService.get_run_results_csv(run_id)
 
+    @classmethod
+    def iter_run_results_csv(cls, run_id: str, chunk_rows: int = 1000) -> Optional[Iterator[str]]:
+        return EvaluationReportService.iter_run_results_csv(run_id, chunk_rows)
+
     @classmethod
     def get_recommendations(cls, run_id: str) -> Tuple[bool, List[Dict[str, Any]] | str]:
         return EvaluationReportService.get_recommendations(run_id)
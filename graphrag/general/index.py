@@ -59,7 +59,7 @@ async def run_graphrag(
     start = asyncio.get_running_loop().time()
     tenant_id, kb_id, doc_id = row["tenant_id"], str(row["kb_id"]), row["doc_id"]
     chunks = []
-    for d in settings.retriever.chunk_list(doc_id, tenant_id, [kb_id], max_count=sys.maxsize, fields=["content_with_weight", "doc_id"], sort_by_position=True):
+    async for d in settings.retriever.chunk_list_async(doc_id, tenant_id, [kb_id], max_count=sys.maxsize, fields=["content_with_weight", "doc_id"], sort_by_position=True):
         chunks.append(d["content_with_weight"])
 
     timeout_sec = max(120, len(chunks) * 60 * 10) if enable_timeout_assertion else 10000000000
@@ -195,7 +195,7 @@ async def run_graphrag_for_kb(
         current_chunk = ""
 
         # Use sys.maxsize to process all chunks lazily
-        raw_chunks = settings.retriever.chunk_list(
+        raw_chunks = settings.retriever.chunk_list_async(
             doc_id,
             tenant_id,
             [kb_id],
@@ -204,7 +204,7 @@ async def run_graphrag_for_kb(
             sort_by_position=True,
         )
 
-        for d in raw_chunks:
+        async for d in raw_chunks:
             content = d["content_with_weight"]
             if num_tokens_from_string(current_chunk + content) < 4096:
                 current_chunk += content
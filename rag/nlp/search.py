@@ -18,6 +18,7 @@ import json
 import logging
 import math
 from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass
 
 from rag.prompts.generator import relevant_chunks_with_toc
@@ -33,10 +34,23 @@ from rag.nlp.rerank_service import RerankService
 from rag.nlp.tag_service import TagService
 
 
+CHUNK_LIST_PAGE_SIZE = 128
+CHUNK_LIST_CONCURRENCY = 8  # Max pages chunk_list_async keeps in flight
+
+
 def index_name(uid):
     return f"ragflow_{uid}"
 
 
+def _assemble_chunks(fields: dict[str, dict]) -> list[dict]:
+    """Stamp each chunk returned by ``get_fields`` with its id, in hit order."""
+    chunks: list[dict] = []
+    for chunk_id, chunk in fields.items():
+        chunk["id"] = chunk_id
+        chunks.append(chunk)
+    return chunks
+
+
 @dataclass
 class SearchResult:
     total: int
@@ -324,38 +338,89 @@ class Dealer:
         tbl = self.dataStore.sql(sql, fetch_size, format)
         return tbl
 
-    def chunk_list(self, doc_id: str, tenant_id: str, kb_ids: list[str], max_count=1024, offset=0, fields=["docnm_kwd", "content_with_weight", "img_id"], sort_by_position: bool = False):
-        condition = {"doc_id": doc_id}
-
+    @staticmethod
+    def _chunk_list_query(fields: list[str] | None, sort_by_position: bool) -> tuple[list[str], OrderByExpr]:
         fields_set = set(fields or [])
         if sort_by_position:
             for need in ("page_num_int", "position_int", "top_int"):
                 if need not in fields_set:
                     fields_set.add(need)
-        fields = list(fields_set)
 
         orderBy = OrderByExpr()
         if sort_by_position:
             orderBy.asc("page_num_int")
             orderBy.asc("position_int")
             orderBy.asc("top_int")
+        return list(fields_set), orderBy
 
-        bs = 128
+    def chunk_list(
+        self,
+        doc_id: str,
+        tenant_id: str,
+        kb_ids: list[str],
+        max_count: int = 1024,
+        offset: int = 0,
+        fields: list[str] | None = ["docnm_kwd", "content_with_weight", "img_id"],
+        sort_by_position: bool = False,
+    ) -> Iterator[dict]:
+        if not kb_ids:
+            return
+        condition = {"doc_id": doc_id}
+        fields, orderBy = self._chunk_list_query(fields, sort_by_position)
+
+        bs = CHUNK_LIST_PAGE_SIZE
         for p in range(offset, max_count, bs):
             es_res = self.dataStore.search(fields, [], condition, [], orderBy, p, bs, index_name(tenant_id), kb_ids)
-            dict_chunks = self.dataStore.get_fields(es_res, fields)
-            for id, doc in dict_chunks.items():
-                doc["id"] = id
-            if dict_chunks:
-                for chunk in dict_chunks.values():
-                    yield chunk
+            yield from _assemble_chunks(self.dataStore.get_fields(es_res, fields))
             # Only terminate if there are no hits in the search result,
             # not if the chunks are empty (which could happen due to field filtering).
             if len(self.dataStore.get_doc_ids(es_res)) == 0:
                 break
 
+    async def chunk_list_async(
+        self,
+        doc_id: str,
+        tenant_id: str,
+        kb_ids: list[str],
+        max_count: int = 1024,
+        offset: int = 0,
+        fields: list[str] | None = ["docnm_kwd", "content_with_weight", "img_id"],
+        sort_by_position: bool = False,
+        concurrency: int = CHUNK_LIST_CONCURRENCY,
+    ) -> AsyncIterator[dict]:
+        """Async counterpart of chunk_list that fetches pages concurrently.
+
+        Pages are requested in windows that start at one page and double up to
+        ``concurrency``, so short documents cost a single round-trip while long
+        ones overlap up to ``concurrency`` requests. Chunks are yielded in the
+        same order as chunk_list.
+        """
+        if not kb_ids:
+            return
+        condition = {"doc_id": doc_id}
+        fields, orderBy = self._chunk_list_query(fields, sort_by_position)
+        idx_nm = index_name(tenant_id)
+        bs = CHUNK_LIST_PAGE_SIZE
+
+        def fetch(p):
+            es_res = self.dataStore.search(fields, [], condition, [], orderBy, p, bs, idx_nm, kb_ids)
+            return self.dataStore.get_fields(es_res, fields), len(self.dataStore.get_doc_ids(es_res))
+
+        p, window = offset, 1
+        while p < max_count:
+            starts = range(p, min(p + window * bs, max_count), bs)
+            pages = await asyncio.gather(*(asyncio.to_thread(fetch, start) for start in starts))
+            for dict_chunks, hits in pages:
+                for chunk in _assemble_chunks(dict_chunks):
+                    yield chunk
+                # Same termination rule as chunk_list: stop at the first page without hits.
+                if hits == 0:
+                    return
+            p += len(starts) * bs
+            window = min(window * 2, max(concurrency, 1))
+
     def all_tags(self, tenant_id: str, kb_ids: list[str], S=1000):
-        return self.tag_service.all_tags(tenant_id, kb_ids, S)
+        return self.tag_service.all_tags(tenant_id, kb_ids)
 
     def all_tags_in_portion(self, tenant_id: str, kb_ids: list[str], S=1000):
         return self.tag_service.all_tags_in_portion(tenant_id, kb_ids, S)
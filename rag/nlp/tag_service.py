@@ -13,6 +13,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+import numpy as np
 
 from common.doc_store.doc_store_base import OrderByExpr
 from common.constants import TAG_FLD
@@ -22,6 +23,7 @@ SCORE_SCALE = 0.1  # Scales raw tag scores to final score range
 EPSILON = 1e-6  # Prevents division-by-zero
 DEFAULT_TAG_FREQ = 0.0001  # Fallback tag frequency used in smoothing
 DEFAULT_S = 1000  # Smoothing constant in the smoothing formula
+MIN_TAG_SCORE = 0.001  # Tags scoring below this are dropped
 
 
 def index_name(uid):
@@ -32,21 +34,30 @@ class TagService:
     def __init__(self, dataStore, qryr):
         self.dataStore = dataStore
         self.qryr = qryr
+        self._index_name_cache: dict[str, str] = {}
+
+    def _index(self, tenant_id: str) -> str:
+        name = self._index_name_cache.get(tenant_id)
+        if name is None:
+            name = self._index_name_cache[tenant_id] = index_name(tenant_id)
+        return name
 
     def all_tags(self, tenant_id: str, kb_ids: list[str]):
         if not kb_ids:
             return []
-        if not self.dataStore.index_exist(index_name(tenant_id), kb_ids[0]):
+        idx_nm = self._index(tenant_id)
+        if not self.dataStore.index_exist(idx_nm, kb_ids[0]):
             return []
-        res = self.dataStore.search([], [], {}, [], OrderByExpr(), 0, 0, index_name(tenant_id), kb_ids, ["tag_kwd"])
+        res = self.dataStore.search([], [], {}, [], OrderByExpr(), 0, 0, idx_nm, kb_ids, ["tag_kwd"])
         return self.dataStore.get_aggregation(res, "tag_kwd")
 
     def all_tags_in_portion(self, tenant_id: str, kb_ids: list[str], S=DEFAULT_S):
         if not kb_ids:
             return {}
-        if not self.dataStore.index_exist(index_name(tenant_id), kb_ids[0]):
+        idx_nm = self._index(tenant_id)
+        if not self.dataStore.index_exist(idx_nm, kb_ids[0]):
             return {}
-        res = self.dataStore.search([], [], {}, [], OrderByExpr(), 0, 0, index_name(tenant_id), kb_ids, ["tag_kwd"])
+        res = self.dataStore.search([], [], {}, [], OrderByExpr(), 0, 0, idx_nm, kb_ids, ["tag_kwd"])
         res = self.dataStore.get_aggregation(res, "tag_kwd")
         total = sum(c for _, c in res)
         return {t: (c + 1) / (total + S) for t, c in res}
@@ -56,7 +67,7 @@ class TagService:
         Calculate tags for a document based on content matching and tag frequency.
         Score = SCORE_SCALE * (match_count + 1) / (total_matches + S) / max(EPSILON, global_tag_freq)
         """
-        idx_nm = index_name(tenant_id)
+        idx_nm = self._index(tenant_id)
         match_txt = self.qryr.paragraph(doc["title_tks"] + " " + doc["content_ltks"], doc.get("important_kwd", []), keywords_topn)
         res = self.dataStore.search([], [], {}, [match_txt], OrderByExpr(), 0, 0, idx_nm, kb_ids, ["tag_kwd"])
         aggs = self.dataStore.get_aggregation(res, "tag_kwd")
@@ -64,27 +75,29 @@ class TagService:
             return False
         cnt = sum(c for _, c in aggs)
         tag_fea = self._compute_tag_scores(aggs, all_tags, cnt, S, topn_tags)
-        doc[TAG_FLD] = {a.replace(".", "_"): c for a, c in tag_fea if c >= 0.001}
+        doc[TAG_FLD] = {a.replace(".", "_"): c for a, c in tag_fea}
         return True
 
     def _compute_tag_scores(self, aggs, all_tags, cnt, S, topn_tags):
-        scores = []
-        for tag, count in aggs:
-            # Score = SCORE_SCALE * (match_count + 1) / (total_matches + S) / max(EPSILON, global_tag_freq)
-            freq = all_tags.get(tag, DEFAULT_TAG_FREQ)
-            score = SCORE_SCALE * (count + 1) / (cnt + S) / max(EPSILON, freq)
-            scores.append((tag, score))
+        """Return the top ``topn_tags`` (tag, score) pairs scoring at least MIN_TAG_SCORE, best first."""
+        tags = [tag for tag, _ in aggs]
+        counts = np.fromiter((count for _, count in aggs), dtype=np.float64, count=len(aggs))
+        freqs = np.fromiter((all_tags.get(tag, DEFAULT_TAG_FREQ) for tag in tags), dtype=np.float64, count=len(tags))
+
+        # Score = SCORE_SCALE * (match_count + 1) / (total_matches + S) / max(EPSILON, global_tag_freq)
+        scores = SCORE_SCALE * (counts + 1) / (cnt + S) / np.maximum(EPSILON, freqs)
 
-        # Sort by score descending
-        scores.sort(key=lambda x: x[1], reverse=True)
+        keep = np.flatnonzero(scores >= MIN_TAG_SCORE)
+        # Stable sort so ties keep aggregation order
+        top = keep[np.argsort(-scores[keep], kind="stable")[:topn_tags]]
 
-        return scores[:topn_tags]
+        return [(tags[i], float(scores[i])) for i in top]
 
     def tag_query(self, question: str, tenant_ids: str | list[str], kb_ids: list[str], all_tags, topn_tags=3, S=DEFAULT_S):
         if isinstance(tenant_ids, str):
-            idx_nms = index_name(tenant_ids)
+            idx_nms = self._index(tenant_ids)
         else:
-            idx_nms = [index_name(tid) for tid in tenant_ids]
+            idx_nms = [self._index(tid) for tid in tenant_ids]
         match_txt, _ = self.qryr.question(question, min_match=0.0)
         res = self.dataStore.search([], [], {}, [match_txt], OrderByExpr(), 0, 0, idx_nms, kb_ids, ["tag_kwd"])
         aggs = self.dataStore.get_aggregation(res, "tag_kwd")
@@ -92,4 +105,4 @@ class TagService:
             return {}
         cnt = sum(c for _, c in aggs)
         tag_fea = self._compute_tag_scores(aggs, all_tags, cnt, S, topn_tags)
-        return {a.replace(".", "_"): c for a, c in tag_fea if c >= 0.001}
+        return {a.replace(".", "_"): c for a, c in tag_fea}
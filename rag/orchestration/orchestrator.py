@@ -14,14 +14,35 @@
 #  limitations under the License.
 #
 
+import importlib
 import logging
 import re
 from timeit import default_timer as timer
-from rag.orchestration.router import PARSERS, by_deepdoc, by_mineru, by_docling, by_tcadp, by_paddleocr, by_plaintext, UniversalRouter
-from rag.templates.general import General
+from typing import TYPE_CHECKING
 from .base import StandardizedDocument
-from rag.utils.file_utils import extract_embed_file, extract_html
-from rag.nlp import rag_tokenizer
+
+if TYPE_CHECKING:
+    from rag.orchestration.router import PARSERS, by_deepdoc, by_mineru, by_docling, by_tcadp, by_paddleocr, by_plaintext, UniversalRouter  # noqa: F401
+    from rag.templates.general import General  # noqa: F401
+    from rag.utils.file_utils import extract_embed_file, extract_html  # noqa: F401
+    from rag.nlp import rag_tokenizer  # noqa: F401
+
+# Heavy dependencies (parsers, templates, tokenizer) are imported on first use
+# via the module __getattr__ below, so importing the orchestrator stays cheap.
+_LAZY_IMPORTS = {
+    "PARSERS": "rag.orchestration.router",
+    "by_deepdoc": "rag.orchestration.router",
+    "by_mineru": "rag.orchestration.router",
+    "by_docling": "rag.orchestration.router",
+    "by_tcadp": "rag.orchestration.router",
+    "by_paddleocr": "rag.orchestration.router",
+    "by_plaintext": "rag.orchestration.router",
+    "UniversalRouter": "rag.orchestration.router",
+    "General": "rag.templates.general",
+    "extract_embed_file": "rag.utils.file_utils",
+    "extract_html": "rag.utils.file_utils",
+    "rag_tokenizer": "rag.nlp",
+}
 
 # Re-exporting classes/functions for backward compatibility if needed
 # Docx, Pdf, Markdown are internal classes now in format_parsers, not strictly needed to be exported unless external usage exists.
@@ -43,6 +64,24 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    """Resolve a lazily imported name and cache it as a module global (PEP 562)."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name):
+    """Look up a lazily imported name from inside this module, honouring patched globals."""
+    try:
+        return globals()[name]
+    except KeyError:
+        return __getattr__(name)
+
+
 class ParsingError(Exception):
     """Raised when document parsing fails and fallbacks are exhausted."""
 
@@ -99,6 +138,8 @@ def chunk(filename, binary=None, from_page=0, to_page=100000, lang="Chinese", ca
     5.  Final text chunking and merging (via General template).
     """
     st = timer()
+    rag_tokenizer = _lazy("rag_tokenizer")
+    UniversalRouter = _lazy("UniversalRouter")
 
     # 1. Setup
     parser_config = kwargs.get("parser_config", {"chunk_token_num": 512, "delimiter": "\n!?。；！？", "layout_recognizer": "DeepDOC", "analyze_hyperlink": True})
@@ -116,7 +157,7 @@ def chunk(filename, binary=None, from_page=0, to_page=100000, lang="Chinese", ca
             # Only extract embedded files at the root call
             # Note: binary might be bytes or BytesIO? extract_embed_file expects bytes usually.
             try:
-                embeds = extract_embed_file(binary)
+                embeds = _lazy("extract_embed_file")(binary)
             except Exception as e:
                 logging.warning(f"Failed to extract embeds: {e}")
         else:
@@ -165,7 +206,7 @@ def chunk(filename, binary=None, from_page=0, to_page=100000, lang="Chinese", ca
     url_res = []
     if urls and parser_config.get("analyze_hyperlink", False) and is_root:
         for index, url in enumerate(urls):
-            html_bytes, metadata = extract_html(url)
+            html_bytes, metadata = _lazy("extract_html")(url)
             if not html_bytes:
                 continue
             try:
@@ -203,7 +244,7 @@ def chunk(filename, binary=None, from_page=0, to_page=100000, lang="Chinese", ca
         if is_docling and isinstance(sections, str):
             sections = sections.splitlines()
 
-        res = General.chunk(filename, sections, tables, section_images, pdf_parser, is_markdown, parser_config, doc, is_english, callback, is_docling=is_docling, **kwargs)
+        res = _lazy("General").chunk(filename, sections, tables, section_images, pdf_parser, is_markdown, parser_config, doc, is_english, callback, is_docling=is_docling, **kwargs)
 
     logging.info("chunk({}): {}".format(filename, timer() - st))
 
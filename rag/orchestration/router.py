@@ -14,14 +14,17 @@
 #  limitations under the License.
 #
 
+import importlib
 import re
 import os
+import sys
 import logging
 from io import BytesIO
-from typing import List, Any
+from typing import TYPE_CHECKING, List, Any
 from dataclasses import dataclass, field
 
-from rag.parsers.deepdoc_client import DeepDocParser
+if TYPE_CHECKING:
+    from rag.parsers.deepdoc_client import DeepDocParser  # noqa: F401
 
 from common.constants import LLMType
 from api.db.services.llm_service import LLMBundle
@@ -41,6 +44,25 @@ from common.parser_config_utils import normalize_layout_recognizer
 from rag.utils.file_utils import extract_links_from_pdf, extract_links_from_docx
 # Embedding extraction logic is handled in naive.py shim for now to avoid moving too much logic at once.
 
+# DeepDocParser pulls in the vision/OCR stack, so it is imported on first use.
+_LAZY_IMPORTS = {"DeepDocParser": "rag.parsers.deepdoc_client"}
+
+
+def _cached_import(module_name, item_name):
+    """Return item_name from module_name, going through import_module only if the module is not loaded yet."""
+    modules = sys.modules
+    if module_name not in modules:
+        importlib.import_module(module_name)
+    return getattr(modules[module_name], item_name)
+
+
+def __getattr__(name):
+    """Resolve a lazily imported name on attribute access (PEP 562)."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _cached_import(module_name, name)
+
 
 @dataclass
 class ParseResult:
@@ -92,7 +114,7 @@ class UniversalRouter:
             if parser_config.get("analyze_hyperlink", False) and is_root:
                 urls = extract_links_from_docx(binary)
 
-            sections, _ = DeepDocParser().parse_docx(filename, binary)
+            sections, _ = _cached_import("rag.parsers.deepdoc_client", "DeepDocParser")().parse_docx(filename, binary)
             return ParseResult(sections=sections, urls=urls)
 
         elif re.search(r"\.pdf$", filename, re.IGNORECASE):
@@ -151,7 +173,7 @@ class UniversalRouter:
             return ParseResult(sections=sections, urls=urls)
 
         elif re.search(r"\.(md|markdown|mdx)$", filename, re.IGNORECASE):
-            sections, tables, section_images, hyperlink_urls = DeepDocParser().parse_markdown(
+            sections, tables, section_images, hyperlink_urls = _cached_import("rag.parsers.deepdoc_client", "DeepDocParser")().parse_markdown(
                 filename, binary, parser_config=parser_config, analyze_hyperlink=parser_config.get("analyze_hyperlink", False) and is_root
             )
             urls.update(hyperlink_urls)
@@ -188,7 +210,7 @@ class UniversalRouter:
 
 
 def by_deepdoc(filename, binary=None, from_page=0, to_page=100000, lang="Chinese", callback=None, pdf_cls=None, **kwargs):
-    parser = DeepDocParser()
+    parser = _cached_import("rag.parsers.deepdoc_client", "DeepDocParser")()
     sections, tables, pdf_parser = parser.parse_pdf(filepath=filename, binary=binary, from_page=from_page, to_page=to_page, callback=callback, **kwargs)
     return sections, tables, pdf_parser
 
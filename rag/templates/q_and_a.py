@@ -34,6 +34,7 @@ from markdown import markdown
 
 
 DEFAULT_TBL_TAG = "@@0\t0\t0\t0\t0##"
+_PREFIX_RE = re.compile(r"^(问题|答案|回答|user|assistant|Q|A|Question|Answer|问|答)[\t:： ]+", re.IGNORECASE)
 get_float = common.float_utils.get_float
 
 
@@ -282,7 +283,7 @@ class Docx(DocxParser):
 
 
 def rmPrefix(txt):
-    return re.sub(r"^(问题|答案|回答|user|assistant|Q|A|Question|Answer|问|答)[\t:： ]+", "", txt.strip(), flags=re.IGNORECASE)
+    return _PREFIX_RE.sub("", txt.strip())
 
 
 def beAdocPdf(d, q, a, eng, image, poss):
@@ -38,8 +38,13 @@ https://github.com/run-llama/llama_index/blob/main/llama-index-core/llama_index/
 """
 
 import re
+import asyncio
+import hashlib
 import logging
-from typing import List, Tuple, Dict, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Tuple, Dict, Any, Iterator
 from dataclasses import dataclass
 
 from rag.orchestration.base import StandardizedDocument
@@ -56,7 +61,6 @@ except ImportError:
 # Try to import token counting utility, fallback to simple estimation
 try:
     import os
-    import threading
     from tiktoken import encoding_for_model
 
     # Default model for token counting
@@ -147,6 +151,9 @@ try:
             _tokenizer_model = model_name
             _enc = None  # Reset encoder to force re-initialization
 
+        # Cached parses were sized with the previous model's token counts
+        _clear_parse_cache()
+
     def _get_encoder():
         """
         Lazy-initialize the tiktoken encoder (thread-safe).
@@ -227,12 +234,68 @@ except ImportError:
             return round(len(text) * 5 / 9)
 
 
-@dataclass
+# LRU cache of _parse_with_headers results. Re-indexing, retries and previews chunk
+# the same document repeatedly; keyed by content digest plus the sizing arguments.
+# Entries are stored as (text chars, frozen chunks) and evicted once the cached
+# chunk text exceeds _PARSE_CACHE_MAX_CHARS in total.
+_PARSE_CACHE_MAX_CHARS = 8 * 1024 * 1024
+_FrozenChunk = Tuple[str, Tuple[str, ...], Tuple[Tuple[str, Any], ...]]  # (text, header_path, metadata items)
+_PARSE_CACHE: "OrderedDict[Tuple[bytes, int, int, bool], Tuple[int, Tuple[_FrozenChunk, ...]]]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+_parse_cache_chars = 0
+
+
+def _clear_parse_cache():
+    """Empty the parse cache and reset its size accounting."""
+    global _parse_cache_chars
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE.clear()
+        _parse_cache_chars = 0
+
+
+# Line states for code fence tracking in Semantic._split_with_headers
+_STATE_TEXT = 0
+_STATE_FENCE = 1
+
+# Regex fallback for sentence splitting when NLTK punkt is unavailable
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _parse_header_line(line: str) -> Tuple[int, str] | None:
+    """
+    Parse an ATX header line ("## Title") without a regex.
+
+    Equivalent to ``re.match(r"^(#+)\s+(.*)", line)``: one or more leading
+    "#" characters followed by whitespace. Callers only pass lines that
+    start with "#", so ordinary text lines never reach this function.
+
+    Returns:
+        Tuple of (level, stripped header text), or None if not a header
+    """
+    level = len(line) - len(line.lstrip("#"))
+    if level == 0 or not line[level : level + 1].isspace():
+        return None
+    return level, line[level:].strip()
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    """Yield the pieces of ``text.split("\n\n")`` one at a time without building the list."""
+    pos = 0
+    while True:
+        sep = text.find("\n\n", pos)
+        if sep == -1:
+            yield text[pos:]
+            return
+        yield text[pos:sep]
+        pos = sep + 2
+
+
+@dataclass(slots=True)
 class SemanticChunk:
-    """A chunk with header hierarchy metadata."""
+    """A chunk with header hierarchy metadata; slotted since documents produce thousands."""
 
     text: str
-    header_path: List[str]  # e.g., ["Introduction", "Background"]
+    header_path: Tuple[str, ...]  # e.g., ("Introduction", "Background")
     metadata: Dict[str, Any]
 
 
@@ -287,7 +350,7 @@ class Semantic:
             ck.update(doc)
 
             # Add header hierarchy metadata (the key new feature)
-            ck["header_path"] = chunk.header_path
+            ck["header_path"] = list(chunk.header_path)
 
             # Merge any additional metadata
             if chunk.metadata:
@@ -304,8 +367,63 @@ class Semantic:
 
         return results
 
+    @staticmethod
+    async def chunk_async(filename: str, standardized_doc: StandardizedDocument, parser_config: dict, doc: dict, is_english: bool, callback=None, **kwargs) -> List[dict]:
+        """
+        Async variant of chunk() for callers already inside an event loop.
+
+        Runs chunk() in a worker thread so the loop is not blocked.
+
+        Returns:
+            List of chunk dicts ready for storage/embedding, in document order
+        """
+        return await asyncio.to_thread(Semantic.chunk, filename, standardized_doc, parser_config, doc, is_english, callback, **kwargs)
+
     @staticmethod
     def _parse_with_headers(content: str, chunk_token_num: int, overlap_percent: int, is_english: bool = True) -> List[SemanticChunk]:
+        """
+        Memoized front end for _split_with_headers.
+
+        Results are cached per (content digest, chunk_token_num, overlap_percent,
+        is_english) with LRU eviction bounded by total chunk text size. The cache
+        keeps an immutable copy and every call gets its own SemanticChunk objects,
+        so mutating the returned chunks never affects the cache.
+
+        Returns:
+            List of SemanticChunk objects
+        """
+        global _parse_cache_chars
+
+        if not content:
+            return []
+
+        key = (hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), chunk_token_num, overlap_percent, is_english)
+        with _PARSE_CACHE_LOCK:
+            entry = _PARSE_CACHE.get(key)
+            if entry is not None:
+                _PARSE_CACHE.move_to_end(key)
+        if entry is not None:
+            # Metadata values are flat (token counts and flags), so a shallow copy suffices
+            return [SemanticChunk(text=text, header_path=header_path, metadata=dict(metadata)) for text, header_path, metadata in entry[1]]
+
+        chunks = Semantic._split_with_headers(content, chunk_token_num, overlap_percent, is_english)
+
+        size = sum(len(chunk.text) for chunk in chunks)
+        if size <= _PARSE_CACHE_MAX_CHARS:
+            frozen = tuple((chunk.text, chunk.header_path, tuple(chunk.metadata.items())) for chunk in chunks)
+            with _PARSE_CACHE_LOCK:
+                previous = _PARSE_CACHE.pop(key, None)
+                if previous is not None:
+                    _parse_cache_chars -= previous[0]
+                _PARSE_CACHE[key] = (size, frozen)
+                _parse_cache_chars += size
+                while _parse_cache_chars > _PARSE_CACHE_MAX_CHARS:
+                    _, (evicted, _) = _PARSE_CACHE.popitem(last=False)
+                    _parse_cache_chars -= evicted
+        return chunks
+
+    @staticmethod
+    def _split_with_headers(content: str, chunk_token_num: int, overlap_percent: int, is_english: bool = True) -> List[SemanticChunk]:
         """
         Stack-based header tracking algorithm.
 
@@ -330,22 +448,39 @@ class Semantic:
         if not content:
             return []
 
-        # Create language-aware token counter for consistent estimation throughout parsing
+        # Create language-aware token counter for consistent estimation throughout parsing.
+        # Cached because the splitters re-count the same words and separators many times.
+        @lru_cache(maxsize=4096)
         def count_tokens(text: str) -> int:
             return num_tokens(text, is_english=is_english)
 
-        lines = content.split("\n")
-
-        header_stack: List[Tuple[int, str]] = []  # (level, text)
-        code_block_fence = None  # Tracks fence type: None, "```", or "~~~"
-        current_section = ""
+        space_tokens_val = count_tokens(" ")
+        separator_tokens = count_tokens("\n\n")
+
+        # (level, full path up to and including this header); every chunk under a header
+        # shares that header's path tuple
+        header_stack: List[Tuple[int, Tuple[str, ...]]] = []
+        # Fence state machine: inside a fence, fence_char/fence_len describe the opening run
+        state = _STATE_TEXT
+        fence_char = ""
+        fence_len = 0
+        # The section being built: an optional normalized header line plus a span of
+        # consecutive content lines, kept as offsets and sliced out of content on emit
+        section_header = ""
+        span_start = None
+        span_end = 0
         chunks: List[SemanticChunk] = []
 
-        def get_header_path() -> List[str]:
-            """Build header path from stack as list of strings."""
-            return [h[1] for h in header_stack]
+        def join_section() -> str:
+            """Rebuild the section text, one newline-terminated line per entry."""
+            body = content[span_start:span_end] + "\n" if span_start is not None else ""
+            return section_header + body
+
+        def get_header_path() -> Tuple[str, ...]:
+            """Header path of the current section, shared rather than rebuilt per chunk."""
+            return header_stack[-1][1] if header_stack else ()
 
-        def emit_chunk(text: str, header_path: List[str]):
+        def emit_chunk(text: str, header_path: Tuple[str, ...]):
             """Create chunk, splitting if too large."""
             if not text.strip():
                 return
@@ -355,16 +490,15 @@ class Semantic:
             if tokens <= chunk_token_num:
                 # Fits in single chunk
                 final_text = text.strip()
-                chunks.append(SemanticChunk(text=final_text, header_path=header_path, metadata={"tokens": count_tokens(final_text)}))
+                final_tokens = tokens if final_text == text else count_tokens(final_text)
+                chunks.append(SemanticChunk(text=final_text, header_path=header_path, metadata={"tokens": final_tokens}))
             else:
-                # Split large sections at paragraph boundaries
-                paragraphs = text.split("\n\n")
+                # Split large sections at paragraph boundaries, walking them lazily
                 current_chunk = ""
                 current_tokens = 0
-                separator_tokens = count_tokens("\n\n")
 
-                def split_large_paragraph(para: str) -> List[str]:
-                    """Split a large paragraph at sentence boundaries."""
+                def split_large_paragraph(para: str) -> Iterator[str]:
+                    """Split a large paragraph at sentence boundaries, yielding each piece as it fills."""
                     sentences = []
                     if _NLTK_AVAILABLE:
                         try:
@@ -376,18 +510,19 @@ class Semantic:
                                 sentences = nltk.sent_tokenize(para)
                             except LookupError:
                                 logging.warning("[Semantic] NLTK 'punkt' or 'punkt_tab' resource not found. Falling back to regex splitting.")
-                                sentences = re.split(r"(?<=[.!?])\s+", para)
+                                sentences = _SENTENCE_SPLIT_RE.split(para)
                         except Exception:
-                            sentences = re.split(r"(?<=[.!?])\s+", para)
+                            sentences = _SENTENCE_SPLIT_RE.split(para)
                     else:
-                        sentences = re.split(r"(?<=[.!?])\s+", para)
+                        sentences = _SENTENCE_SPLIT_RE.split(para)
 
                     if not sentences:
                         logging.warning("[Semantic] No sentences found. Returning original paragraph.")
-                        return [para]
+                        yield para
+                        return
 
                     # Group sentences to fit within chunk_token_num
-                    result = []
+                    emitted = False
                     current_sentence_group = ""
                     current_sentence_tokens = 0
 
@@ -398,7 +533,8 @@ class Semantic:
                         if sentence_tokens > chunk_token_num:
                             # 1. Flush any existing group
                             if current_sentence_group:
-                                result.append(current_sentence_group)
+                                yield current_sentence_group
+                                emitted = True
                                 current_sentence_group = ""
                                 current_sentence_tokens = 0
 
@@ -406,12 +542,12 @@ class Semantic:
                             words = sentence.split(" ")
                             temp_chunk = ""
                             temp_tokens = 0
-                            space_tokens_val = count_tokens(" ")
                             for word in words:
                                 word_tokens = count_tokens(word)
                                 space_tokens = space_tokens_val if temp_chunk else 0
                                 if temp_tokens + word_tokens + space_tokens > chunk_token_num and temp_chunk:
-                                    result.append(temp_chunk)
+                                    yield temp_chunk
+                                    emitted = True
                                     temp_chunk = word
                                     temp_tokens = word_tokens
                                 else:
@@ -419,13 +555,15 @@ class Semantic:
                                     temp_tokens += word_tokens + space_tokens
 
                             if temp_chunk:
-                                result.append(temp_chunk)
+                                yield temp_chunk
+                                emitted = True
                             continue
 
-                        space_tokens = count_tokens(" ") if current_sentence_group else 0
+                        space_tokens = space_tokens_val if current_sentence_group else 0
 
                         if current_sentence_tokens + sentence_tokens + space_tokens > chunk_token_num and current_sentence_group:
-                            result.append(current_sentence_group)
+                            yield current_sentence_group
+                            emitted = True
                             current_sentence_group = sentence
                             current_sentence_tokens = sentence_tokens
                         else:
@@ -433,11 +571,11 @@ class Semantic:
                             current_sentence_tokens += sentence_tokens + space_tokens
 
                     if current_sentence_group:
-                        result.append(current_sentence_group)
-
-                    return result if result else [para]
+                        yield current_sentence_group
+                    elif not emitted:
+                        yield para
 
-                for para in paragraphs:
+                for para in _iter_paragraphs(text):
                     para_tokens = count_tokens(para)
 
                     # Handle oversized paragraphs
@@ -449,8 +587,7 @@ class Semantic:
                             current_tokens = 0
 
                         # Split the large paragraph
-                        para_pieces = split_large_paragraph(para)
-                        for piece in para_pieces:
+                        for piece in split_large_paragraph(para):
                             piece_tokens = count_tokens(piece)
                             if piece_tokens <= chunk_token_num:
                                 chunks.append(SemanticChunk(text=piece.strip(), header_path=header_path, metadata={"tokens": piece_tokens}))
@@ -515,63 +652,67 @@ class Semantic:
                     final_text = current_chunk.strip()
                     chunks.append(SemanticChunk(text=final_text, header_path=header_path, metadata={"tokens": count_tokens(final_text)}))
 
-        for line in lines:
-            # Track code blocks (don't parse headers inside them)
-            # Support both backtick (```) and tilde (~~~) fenced code blocks per CommonMark spec
-            # Only matching fence types can close a block (e.g., ``` closes ```, not ~~~)
-            stripped = line.lstrip()
-
-            # Check for backtick fence
-            if stripped.startswith("```"):
-                if code_block_fence is None:
-                    # Opening a backtick fence
-                    code_block_fence = "```"
-                elif code_block_fence == "```":
-                    # Closing the matching backtick fence
-                    code_block_fence = None
-                # If code_block_fence is "~~~", this is content inside a tilde fence, not a fence marker
-                current_section += line + "\n"
-                continue
-
-            # Check for tilde fence
-            if stripped.startswith("~~~"):
-                if code_block_fence is None:
-                    # Opening a tilde fence
-                    code_block_fence = "~~~"
-                elif code_block_fence == "~~~":
-                    # Closing the matching tilde fence
-                    code_block_fence = None
-                # If code_block_fence is "```", this is content inside a backtick fence, not a fence marker
-                current_section += line + "\n"
-                continue
-
-            if code_block_fence is None:
-                # Check for Markdown header
-                header_match = re.match(r"^(#+)\s+(.*)", line)
-                if header_match:
-                    # Emit previous section before processing new header
-                    emit_chunk(current_section, get_header_path())
-
-                    level = len(header_match.group(1))
-                    text = header_match.group(2).strip()
-
-                    # Pop headers of equal or higher level
-                    # This handles going "up" the hierarchy (e.g., H3 -> H2)
-                    while header_stack and header_stack[-1][0] >= level:
-                        header_stack.pop()
-
-                    # Push new header onto stack
-                    header_stack.append((level, text))
-
-                    # Start new section with header line
-                    current_section = f"{'#' * level} {text}\n"
-                    continue
-
-            # Regular content line
-            current_section += line + "\n"
+        # Walk the lines with a cursor instead of materializing content.split("\n");
+        # only lines that may be a fence or header are sliced out as strings
+        pos = 0
+        while True:
+            nl = content.find("\n", pos)
+            end = len(content) if nl == -1 else nl
+            first = content[pos : pos + 1]
+            header = None
+
+            if first in ("#", "`", "~") or first.isspace():
+                line = content[pos:end]
+                # Track code blocks (don't parse headers inside them)
+                # Support both backtick (```) and tilde (~~~) fenced code blocks per CommonMark spec:
+                # only a run of the opening fence character at least as long as the opening
+                # fence closes the block (e.g., ``` closes ```, not ~~~ and not an open ````)
+                stripped = line.lstrip()
+                first = stripped[:1]
+
+                if state == _STATE_FENCE:
+                    if first == fence_char and stripped.startswith(fence_char * fence_len):
+                        state = _STATE_TEXT
+                    # Anything else is content inside the fence, not a fence marker or header
+                elif first in ("`", "~") and stripped.startswith(first * 3):
+                    # Opening fence: remember its character and run length
+                    fence_char = first
+                    fence_len = len(stripped) - len(stripped.lstrip(first))
+                    state = _STATE_FENCE
+                elif line[:1] == "#":
+                    # Check for Markdown header
+                    header = _parse_header_line(line)
+
+            if header:
+                # Emit previous section before processing new header
+                emit_chunk(join_section(), get_header_path())
+
+                level, text = header
+
+                # Pop headers of equal or higher level
+                # This handles going "up" the hierarchy (e.g., H3 -> H2)
+                while header_stack and header_stack[-1][0] >= level:
+                    header_stack.pop()
+
+                # Push new header onto stack, extending its parent's path
+                parent_path = header_stack[-1][1] if header_stack else ()
+                header_stack.append((level, parent_path + (text,)))
+
+                # Start new section with header line
+                section_header = f"{'#' * level} {text}\n"
+                span_start = None
+            else:
+                # Regular content or fence line
+                if span_start is None:
+                    span_start = pos
+                span_end = end
+
+            if nl == -1:
+                break
+            pos = nl + 1
 
         # Emit final section
-        emit_chunk(current_section, get_header_path())
+        emit_chunk(join_section(), get_header_path())
 
         return chunks
 
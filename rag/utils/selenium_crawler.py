@@ -6,6 +6,13 @@ from deepdoc.parser.html_parser import RAGFlowHtmlParser
 from api.db.services.file_service import FileService
 import logging
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+
+    _INOTIFY_AVAILABLE = True
+except ImportError:
+    _INOTIFY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,9 +29,33 @@ class _LocalFile:
             return f.read()
 
 
+def _open_download_watch(download_path):
+    """Watch download_path for new or finished files; None when inotify is unavailable."""
+    if not _INOTIFY_AVAILABLE:
+        return None
+    watcher = INotify()
+    try:
+        watcher.add_watch(download_path, inotify_flags.CREATE | inotify_flags.MOVED_TO | inotify_flags.CLOSE_WRITE)
+    except OSError as e:
+        logger.debug(f"inotify watch on {download_path} failed, polling instead: {e}")
+        watcher.close()
+        return None
+    return watcher
+
+
 class SeleniumCrawler:
     @staticmethod
     def wait_for_download(download_path, timeout=120, expected_filename=None):
+        # Register the watch before the initial listing so no completed file slips between them
+        watcher = _open_download_watch(download_path)
+        try:
+            return SeleniumCrawler._wait_for_download(download_path, timeout, expected_filename, watcher)
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    @staticmethod
+    def _wait_for_download(download_path, timeout, expected_filename, watcher):
         start_time = time.time()
         initial_files = set(os.listdir(download_path)) if expected_filename is None else set()
 
@@ -40,21 +71,27 @@ class SeleniumCrawler:
                     except (FileNotFoundError, OSError):
                         continue
             else:
-                files = os.listdir(download_path)
-                for fname in files:
-                    if fname in initial_files or fname.endswith(".crdownload"):
-                        continue
-                    file_path = os.path.join(download_path, fname)
-                    if os.path.isfile(file_path):
-                        try:
-                            # Check if file size is stable
-                            initial_size = os.path.getsize(file_path)
-                            time.sleep(1)
-                            if os.path.getsize(file_path) == initial_size:
-                                return fname
-                        except (FileNotFoundError, OSError):
+                # scandir reports file type (and size via one stat) without a separate
+                # isfile/getsize round trip per entry
+                with os.scandir(download_path) as entries:
+                    candidates = [entry for entry in entries if entry.name not in initial_files and not entry.name.endswith(".crdownload")]
+                for entry in candidates:
+                    try:
+                        if not entry.is_file():
                             continue
-            time.sleep(1)
+                        # Check if file size is stable; DirEntry.stat() is cached, so re-stat the path
+                        initial_size = entry.stat().st_size
+                        time.sleep(1)
+                        if os.path.getsize(entry.path) == initial_size:
+                            return entry.name
+                    except (FileNotFoundError, OSError):
+                        continue
+            if watcher is None:
+                time.sleep(1)
+            else:
+                # Block until the directory changes instead of re-scanning it every second
+                remaining_ms = max(0, int((timeout - (time.time() - start_time)) * 1000))
+                watcher.read(timeout=remaining_ms)
         raise TimeoutError("Download timed out")
 
     @staticmethod
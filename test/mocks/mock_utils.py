@@ -1,3 +1,4 @@
+import contextlib
 import sys
 from unittest.mock import MagicMock
 import types
@@ -308,3 +309,64 @@ def teardown_mocks(original_modules):
 
     # Restore keys that were modified
     sys.modules.update(original_modules)
+
+
+@contextlib.contextmanager
+def patch_modules(overrides, purge=()):
+    """
+    Temporarily install ``overrides`` into sys.modules.
+
+    Unlike ``patch.dict(sys.modules, ...)``, only the overridden keys are saved
+    and restored, so entering does not copy the whole of sys.modules.
+
+    Args:
+        overrides (dict): Module name -> stub module to install.
+        purge (Iterable[str]): Modules imported against the stubs that must not
+            outlive them; they are dropped from sys.modules (and from their
+            parent package) on exit.
+    """
+    missing = object()
+    modules = sys.modules
+    saved = {k: modules.get(k, missing) for k in overrides}
+    modules.update(overrides)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is missing:
+                modules.pop(k, None)
+            else:
+                modules[k] = v
+        for name in purge:
+            if modules.pop(name, None) is None:
+                continue
+            parent, _, child = name.rpartition(".")
+            if parent in modules:
+                modules[parent].__dict__.pop(child, None)
+
+
+@contextlib.contextmanager
+def scoped_mocks(purge=()):
+    """
+    Apply setup_mocks() for the duration of the block.
+
+    Unlike setup_mocks/teardown_mocks, only the entries setup_mocks replaced are
+    restored on exit; real modules first imported inside the block (numpy and
+    other native extensions, which cannot be loaded twice) stay in sys.modules.
+
+    Args:
+        purge (Iterable[str]): Modules imported against the mocks that must not
+            outlive them, as for patch_modules.
+    """
+    before = sys.modules.copy()
+    setup_mocks()
+    missing = object()
+    stubs = {k: v for k, v in sys.modules.items() if before.get(k, missing) is not v}
+    # Roll back and reinstall through patch_modules so the restore logic lives in one place
+    for k in stubs:
+        if k in before:
+            sys.modules[k] = before[k]
+        else:
+            del sys.modules[k]
+    with patch_modules(stubs, purge=purge):
+        yield
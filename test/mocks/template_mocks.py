@@ -0,0 +1,54 @@
+"""
+Prebuilt sys.modules stubs for the rag.templates unit tests.
+
+The stubs are built once at import time so test classes can share them through
+``patch.dict(sys.modules, PREBUILT)`` instead of allocating fresh MagicMocks in
+every setUp.
+"""
+
+from unittest.mock import MagicMock
+
+_MOCKED_MODULES = (
+    "docx",
+    "docx.Document",
+    "docx.opc.exceptions",
+    "docx.oxml",
+    "docx.image",
+    "docx.image.exceptions",
+    "docx.opc",
+    "docx.opc.pkgreader",
+    "docx.opc.oxml",
+    "docx.table",
+    "docx.text",
+    "docx.text.paragraph",
+    "bs4",
+    "bs4.BeautifulSoup",
+    "bs4.NavigableString",
+    "bs4.Tag",
+    "bs4.Comment",
+    "huggingface_hub",
+    "pdfplumber",
+    "xgboost",
+    "sklearn",
+    "sklearn.cluster",
+    "sklearn.metrics",
+    "pypdf",
+    "pptx",  # Mock pptx manually here if needed or rely on conftest
+    "deepdoc",
+    "deepdoc.parser",
+    "deepdoc.vision",
+    "common",
+    "common.constants",
+    "common.parser_config_utils",
+    "common.token_utils",  # Ensure this is mocked!
+    "rag.nlp",
+    "rag.orchestration.router",
+)
+
+PREBUILT = {name: MagicMock() for name in _MOCKED_MODULES}
+
+# Setup specific mocks
+PREBUILT["rag.nlp"].bullets_category.return_value = []
+PREBUILT["rag.nlp"].docx_question_level.return_value = (1, "text")
+# `from common import settings` resolves to this attribute; a MagicMock here breaks `> 1` comparisons
+PREBUILT["common"].settings.PARALLEL_DEVICES = 0
@@ -61,12 +61,12 @@ class TestGraphRagIndex(unittest.IsolatedAsyncioTestCase):
         embedding_model = MagicMock()
         callback = MagicMock()
 
-        # Mock settings.retriever.chunk_list to return a generator
-        def mock_chunk_list_gen(*args, **kwargs):
+        # Mock settings.retriever.chunk_list_async to return an async generator
+        async def mock_chunk_list_gen(*args, **kwargs):
             yield {"content_with_weight": "chunk1"}
             yield {"content_with_weight": "chunk2"}
 
-        mock_settings.retriever.chunk_list.side_effect = mock_chunk_list_gen
+        mock_settings.retriever.chunk_list_async.side_effect = mock_chunk_list_gen
 
         # Mock Redis lock
         mock_lock_instance = MagicMock()
@@ -86,9 +86,9 @@ class TestGraphRagIndex(unittest.IsolatedAsyncioTestCase):
         )
 
         # Verification
-        # Check if chunk_list was called with max_count=sys.maxsize
-        mock_settings.retriever.chunk_list.assert_called()
-        args, kwargs = mock_settings.retriever.chunk_list.call_args
+        # Check if chunk_list_async was called with max_count=sys.maxsize
+        mock_settings.retriever.chunk_list_async.assert_called()
+        args, kwargs = mock_settings.retriever.chunk_list_async.call_args
         self.assertEqual(kwargs['max_count'], sys.maxsize)
         self.assertEqual(args[0], "doc_1")
 
@@ -1,4 +1,6 @@
+import asyncio
 import sys
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -25,41 +27,127 @@ def tearDownModule():
             del sys.modules[mod]
 
 
+class _FakeStore:
+    """Minimal datastore for chunk_list tests.
+
+    Pages are pulled lazily from an iterator of ``(search_result, fields)``
+    pairs, so long pagination scenarios don't have to be materialized.
+    """
+
+    def __init__(self, pages):
+        self._pages = iter(pages)
+        self._fields = None
+        self.search_calls = 0
+
+    def search(self, *args, **kwargs):
+        self.search_calls += 1
+        res, self._fields = next(self._pages)
+        return res
+
+    def get_fields(self, res, fields):
+        return self._fields
+
+    def get_doc_ids(self, res):
+        return [d["_id"] for d in res["hits"]["hits"]]
+
+
+class _PagedStore:
+    """Thread-safe datastore whose pages are addressed by search offset."""
+
+    def __init__(self, total, page_size=128):
+        self.total = total
+        self.page_size = page_size
+        self.offsets = []
+        self._lock = threading.Lock()
+
+    def search(self, fields, highlight, condition, match, order_by, offset, limit, *args, **kwargs):
+        with self._lock:
+            self.offsets.append(offset)
+        ids = [str(i) for i in range(offset, min(offset + limit, self.total))]
+        return {"hits": {"hits": [{"_id": i} for i in ids]}}
+
+    def get_fields(self, res, fields):
+        return {d["_id"]: {"content_with_weight": d["_id"]} for d in res["hits"]["hits"]}
+
+    def get_doc_ids(self, res):
+        return [d["_id"] for d in res["hits"]["hits"]]
+
+
 class TestChunkList(unittest.TestCase):
     @patch("rag.nlp.search.query.FulltextQueryer", autospec=True)
     def test_chunk_list_termination(self, mock_queryer):
         from rag.nlp.search import Dealer
 
-        # Mock dataStore
-        mock_store = MagicMock()
-
-        # Setup Dealer
-        dealer = Dealer(mock_store)
-
         # Scenario:
         # Page 0: search returns hits, but get_fields returns empty (simulating filtering)
         # Page 1: search returns hits, get_fields returns chunks
         # Page 2: search returns empty (end of results)
+        store = _FakeStore(
+            [
+                ({"hits": {"hits": [{"_id": "1"}]}}, {}),
+                ({"hits": {"hits": [{"_id": "2"}]}}, {"2": {"content_with_weight": "some content"}}),
+                ({"hits": {"hits": []}}, {}),
+            ]
+        )
+        dealer = Dealer(store)
 
-        # Mock search results
-        res_page_0 = {"hits": {"hits": [{"_id": "1"}]}}
-        res_page_1 = {"hits": {"hits": [{"_id": "2"}]}}
-        res_page_2 = {"hits": {"hits": []}}
+        # Run chunk_list
+        chunks = list(dealer.chunk_list("doc_id", "tenant_id", ["kb_id"], max_count=500))
 
-        mock_store.search.side_effect = [res_page_0, res_page_1, res_page_2]
+        self.assertEqual(len(chunks), 1, "Should have retrieved chunks from the second page")
+        self.assertEqual(store.search_calls, 3)
 
-        # Mock get_fields
-        mock_store.get_fields.side_effect = [{}, {"2": {"content_with_weight": "some content"}}, {}]
+    @patch("rag.nlp.search.query.FulltextQueryer", autospec=True)
+    def test_chunk_list_deep_pagination(self, mock_queryer):
+        from rag.nlp.search import Dealer
 
-        def get_doc_ids_side_effect(res):
-            return [d["_id"] for d in res["hits"]["hits"]]
+        pages = 1000
 
-        mock_store.get_doc_ids.side_effect = get_doc_ids_side_effect
+        def page_gen():
+            for p in range(pages):
+                cid = str(p)
+                yield {"hits": {"hits": [{"_id": cid}]}}, {cid: {"content_with_weight": cid}}
+            yield {"hits": {"hits": []}}, {}
 
-        # Run chunk_list
-        chunks = list(dealer.chunk_list("doc_id", "tenant_id", ["kb_id"], max_count=500))
+        store = _FakeStore(page_gen())
+        dealer = Dealer(store)
 
-        self.assertEqual(len(chunks), 1, "Should have retrieved chunks from the second page")
+        chunks = dealer.chunk_list("doc_id", "tenant_id", ["kb_id"], max_count=128 * (pages + 1))
+
+        self.assertEqual(sum(1 for _ in chunks), pages)
+        self.assertEqual(store.search_calls, pages + 1)
+
+    @patch("rag.nlp.search.query.FulltextQueryer", autospec=True)
+    def test_chunk_list_async_matches_sync(self, mock_queryer):
+        from rag.nlp.search import Dealer
+
+        async def collect(dealer, **kwargs):
+            return [c async for c in dealer.chunk_list_async("doc_id", "tenant_id", ["kb_id"], **kwargs)]
+
+        for total, max_count in ((0, 1024), (5, 1024), (128 * 20 + 3, 10**9), (128 * 20, 128 * 10)):
+            sync_store, async_store = _PagedStore(total), _PagedStore(total)
+            expected = list(Dealer(sync_store).chunk_list("doc_id", "tenant_id", ["kb_id"], max_count=max_count))
+
+            chunks = asyncio.run(collect(Dealer(async_store), max_count=max_count, concurrency=4))
+
+            self.assertEqual([c["id"] for c in chunks], [c["id"] for c in expected])
+            self.assertTrue(all(c["id"] == c["content_with_weight"] for c in chunks))
+            # Async fetches never go past max_count
+            self.assertTrue(all(o < max_count for o in async_store.offsets))
+
+    @patch("rag.nlp.search.query.FulltextQueryer", autospec=True)
+    def test_chunk_list_empty_kb_ids(self, mock_queryer):
+        from rag.nlp.search import Dealer
+
+        async def collect(dealer):
+            return [c async for c in dealer.chunk_list_async("doc_id", "tenant_id", [])]
+
+        mock_store = MagicMock()
+        dealer = Dealer(mock_store)
+
+        self.assertEqual(list(dealer.chunk_list("doc_id", "tenant_id", [])), [])
+        self.assertEqual(asyncio.run(collect(dealer)), [])
+        mock_store.search.assert_not_called()
 
     def test_delegation_to_services(self):
         """Verify that Dealer delegates to the new services"""
@@ -79,7 +167,7 @@ class TestChunkList(unittest.TestCase):
         # - insert_citations: tkweight=0.1, vtweight=0.9
         # - rerank: weights=0.3/0.7, chunk_id_name="content_ltks", match_ids=None
         # - rerank_by_model: weights=0.3/0.7, chunk_id_name="content_ltks", match_ids=None
-        # - all_tags/all_tags_in_portion: num=1000
+        # - all_tags_in_portion: num=1000
         # - tag_content: top_n=3, top_k=30, num=1000
         # - tag_query: top_n=3, num=1000
         ans = "ans"
@@ -104,7 +192,7 @@ class TestChunkList(unittest.TestCase):
         tid = "tid"
         kbs = ["kb"]
         dealer.all_tags(tid, kbs)
-        dealer.tag_service.all_tags.assert_called_once_with(tid, kbs, 1000)
+        dealer.tag_service.all_tags.assert_called_once_with(tid, kbs)
 
         # Test all_tags_in_portion
         dealer.all_tags_in_portion(tid, kbs)
@@ -84,6 +84,16 @@ class TestTagService(unittest.TestCase):
         if TAG_FLD in doc:
             self.assertNotIn("tag1", doc[TAG_FLD])
 
+    def test_compute_tag_scores_top_n(self):
+        service = TagService(MagicMock(), MagicMock())
+        aggs = [("low", 0), ("mid", 5), ("high", 50), ("tie", 5)]
+
+        res = service._compute_tag_scores(aggs, {}, 60, 1, 3)
+
+        self.assertEqual([t for t, _ in res], ["high", "mid", "tie"])
+        self.assertTrue(all(isinstance(s, float) for _, s in res))
+        self.assertEqual(service._compute_tag_scores(aggs, {}, 60, 10**9, 3), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,220 +1,188 @@
-import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
-import sys
 
+import pytest
 
-class OrchestratorTestBase(unittest.TestCase):
-    def setUp(self):
-        # Setup mocks
-        self.mock_modules = {
-            "rag.app.format_parsers": MagicMock(),
-            "rag.orchestration.router": MagicMock(),
-            "rag.templates.general": MagicMock(),
-            "rag.templates.semantic": MagicMock(),
-            "rag.nlp": MagicMock(),
-            "rag.utils.file_utils": MagicMock(),
-            "common": MagicMock(),
-            "common.settings": MagicMock(),
-            "api.db.services.llm_service": MagicMock(),
-        }
-
-        # Setup specific mock attributes needed by orchestrator import
-        self.mock_modules["rag.app.format_parsers"].PARSERS = {}
-        # rag.nlp.rag_tokenizer is imported as `from rag.nlp import rag_tokenizer`
-        self.mock_modules["rag.nlp"].rag_tokenizer = MagicMock()
-
-        self.patcher = patch.dict(sys.modules, self.mock_modules)
-        self.patcher.start()
-
-        # Import after patching
-        from rag.orchestration import orchestrator
-        from rag.orchestration.orchestrator import ParsingError
-        from rag.orchestration.router import ParseResult
-        from rag.orchestration.base import StandardizedDocument, DocumentElement
-
-        self.orchestrator = orchestrator
-        self.ParsingError = ParsingError
-        self.ParseResult = ParseResult
-        self.StandardizedDocument = StandardizedDocument
-        self.DocumentElement = DocumentElement
-
-    def tearDown(self):
-        self.patcher.stop()
-
-
-class TestOrchestrator(OrchestratorTestBase):
-    def test_chunk(self):
-        # Setup mocks via existing mocked modules from setUp
-        # orchestrator.UniversalRouter is imported from rag.orchestration.router
-        mock_router = self.mock_modules["rag.orchestration.router"].UniversalRouter
-        mock_general = self.mock_modules["rag.templates.general"].General
-
-        mock_router.route.return_value = self.ParseResult(sections=["section1"])
-        mock_general.chunk.return_value = [{"content": "result"}]
-
-        # Reset counts for this test
-        mock_router.route.reset_mock()
-        mock_general.chunk.reset_mock()
-
-        # Test call
-        filename = "test.docx"
-        binary = b"content"
-        res = self.orchestrator.chunk(filename, binary)
-
-        # Verify calls
-        mock_router.route.assert_called_once()
-        mock_general.chunk.assert_called_once()
-
-        # Verify result
-        self.assertEqual(len(res), 1)
-        self.assertEqual(res[0]["content"], "result")
-
-    @patch("rag.orchestration.orchestrator.extract_embed_file")
-    def test_chunk_with_embeds(self, mock_extract):
-        # Simulate an embedded file
-        mock_extract.return_value = [("embed.pdf", b"embed_content")]
-
-        # Mock dependencies
-        mock_router = self.mock_modules["rag.orchestration.router"].UniversalRouter
-        mock_general = self.mock_modules["rag.templates.general"].General
-
-        mock_router.route.return_value = self.ParseResult()
-        mock_general.chunk.return_value = []
-
-        # Reset counts for this test
-        mock_router.route.reset_mock()
-
-        self.orchestrator.chunk("root.docx", b"root_content")
-
-        # Verify extract called
-        # Verify 2 calls to route: one for the root document, and one for the embedded file.
-        self.assertEqual(mock_router.route.call_count, 2)
-
+from test.mocks.mock_utils import patch_modules
 
-class TestAdaptDoclingOutput(OrchestratorTestBase):
-    """Tests for the adapt_docling_output() adapter function."""
+# Stub modules that shield the orchestrator import from heavy dependencies.
+# They only satisfy imports and attribute lookups, so every key shares one stub;
+# the collaborators tests assert on get fresh mocks from orch_patches instead.
+_MODULE_STUB = MagicMock()
+_MODULE_STUB.PARSERS = {}
+# rag.nlp.rag_tokenizer is imported as `from rag.nlp import rag_tokenizer`
+_MODULE_STUB.rag_tokenizer = MagicMock()
 
-    def test_adapt_string_input(self):
-        """Test adapter with new string format (semantic mode)."""
-        sections = "# Heading\n\nParagraph text here."
-        tables = []
-        parser_config = {"layout_recognizer": "Docling"}
-
-        result = self.orchestrator.adapt_docling_output(sections, tables, parser_config)
-
-        self.assertIsInstance(result, self.StandardizedDocument)
-        self.assertEqual(result.content, sections)
-        self.assertEqual(result.metadata["parser"], "docling")
-        self.assertEqual(result.metadata["layout_recognizer"], "Docling")
-
-    def test_adapt_with_tables(self):
-        """Test adapter handling of tables."""
-        sections = "# Header\nText"
-        tables = [{"type": "table", "content": "| A | B |\n|---|---|\n| 1 | 2 |"}]
-        parser_config = {"layout_recognizer": "Docling"}
+_MOCK_MODULES = dict.fromkeys(
+    (
+        "rag.app.format_parsers",
+        "rag.orchestration.router",
+        "rag.templates.general",
+        "rag.templates.semantic",
+        "rag.nlp",
+        "rag.utils.file_utils",
+        "common",
+        "common.settings",
+        "api.db.services.llm_service",
+    ),
+    _MODULE_STUB,
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patch_sys_modules():
+    """Install the stub modules once for every test in this module."""
+    with patch_modules(_MOCK_MODULES, purge=("rag.orchestration.orchestrator",)):
+        yield
+
+
+@pytest.fixture(scope="module")
+def orchestrator_ctx(_patch_sys_modules):
+    """The orchestrator module and the names the tests use, imported once against the stubs."""
+    from rag.orchestration import orchestrator
+    from rag.orchestration.orchestrator import ParsingError
+    from rag.orchestration.router import ParseResult
+    from rag.orchestration.base import StandardizedDocument, DocumentElement
+
+    return SimpleNamespace(
+        orchestrator=orchestrator,
+        ParsingError=ParsingError,
+        ParseResult=ParseResult,
+        StandardizedDocument=StandardizedDocument,
+        DocumentElement=DocumentElement,
+    )
 
-        result = self.orchestrator.adapt_docling_output(sections, tables, parser_config)
 
-        self.assertIsInstance(result, self.StandardizedDocument)
-        self.assertEqual(result.content, sections)
-        self.assertEqual(result.metadata["tables"], tables)
-        self.assertEqual(result.metadata["parser"], "docling")
-        self.assertEqual(result.metadata["layout_recognizer"], "Docling")
+@pytest.fixture
+def orch_patches(orchestrator_ctx):
+    """Fresh mocks for the collaborators chunk() calls, patched for one test.
 
-    def test_adapt_list_input_legacy(self):
-        """Test adapter with legacy list format."""
-        sections = ["# Heading", "Paragraph text here."]
-        tables = []
-        parser_config = {"layout_recognizer": "Docling"}
+    Semantic is imported lazily inside chunk(), so it is patched on the
+    rag.templates.semantic stub module rather than on the orchestrator.
+    """
+    with (
+        patch("rag.orchestration.orchestrator.UniversalRouter") as router,
+        patch("rag.orchestration.orchestrator.General") as general,
+        patch("rag.templates.semantic.Semantic") as semantic,
+        patch("rag.orchestration.orchestrator.extract_embed_file", return_value=[]) as embeds,
+    ):
+        yield SimpleNamespace(router=router, general=general, semantic=semantic, embeds=embeds)
 
-        result = self.orchestrator.adapt_docling_output(sections, tables, parser_config)
 
-        self.assertIsInstance(result, self.StandardizedDocument)
-        # List should be joined with newlines
-        self.assertEqual(result.content, "# Heading\nParagraph text here.")
+# chunk()
 
-    def test_adapt_empty_string(self):
-        """Test adapter with empty string."""
-        result = self.orchestrator.adapt_docling_output("", [], {})
-        self.assertEqual(result.content, "")
 
-    def test_adapt_empty_list(self):
-        """Test adapter with empty list."""
-        result = self.orchestrator.adapt_docling_output([], [], {})
-        self.assertEqual(result.content, "")
+def test_chunk(orchestrator_ctx, orch_patches):
+    orch_patches.router.route.return_value = orchestrator_ctx.ParseResult(sections=["section1"])
+    orch_patches.general.chunk.return_value = [{"content": "result"}]
 
-    def test_adapter_preserves_elements_empty(self):
-        """Test that elements list is empty initially and then raises if accessed without implementation."""
-        result = self.orchestrator.adapt_docling_output("test", [], {})
-        # In current design, _elements=None leads to _parse_elements which raises NotImplementedError
-        with self.assertRaises(NotImplementedError):
-            _ = result.elements
+    # Test call
+    filename = "test.docx"
+    binary = b"content"
+    res = orchestrator_ctx.orchestrator.chunk(filename, binary)
 
+    # Verify calls
+    orch_patches.router.route.assert_called_once()
+    orch_patches.general.chunk.assert_called_once()
 
-class TestSemanticRouting(OrchestratorTestBase):
-    """Tests for semantic template routing in orchestrator.chunk()."""
+    # Verify result
+    assert len(res) == 1
+    assert res[0]["content"] == "result"
 
-    def setUp(self):
-        super().setUp()
-        # Helper to access mocks
-        self.mock_router = self.mock_modules["rag.orchestration.router"].UniversalRouter
-        self.mock_general = self.mock_modules["rag.templates.general"].General
-        self.mock_semantic = self.mock_modules["rag.templates.semantic"].Semantic
 
-    def test_legacy_path_with_list_sections(self):
-        """Test that list sections still route to General template."""
-        # Sections as list = legacy path
-        self.mock_router.route.return_value = self.ParseResult(sections=["section1", "section2"], is_markdown=False)
-        self.mock_general.chunk.return_value = [{"content": "general result"}]
+def test_chunk_with_embeds(orchestrator_ctx, orch_patches):
+    # Simulate an embedded file
+    orch_patches.embeds.return_value = [("embed.pdf", b"embed_content")]
 
-        parser_config = {"layout_recognizer": "Docling", "use_semantic_chunking": False}
+    orch_patches.router.route.return_value = orchestrator_ctx.ParseResult()
+    orch_patches.general.chunk.return_value = []
 
-        self.mock_general.chunk.reset_mock()
+    orchestrator_ctx.orchestrator.chunk("root.docx", b"root_content")
 
-        # os.environ patch removed as requested
-        self.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
+    # Verify 2 calls to route: one for the root document, and one for the embedded file.
+    assert orch_patches.router.route.call_count == 2
 
-        # Should use General because sections is a list, not string
-        self.mock_general.chunk.assert_called_once()
 
-    def test_semantic_path_with_string_sections(self):
-        """Test that string sections with use_semantic_chunking routes to Semantic template."""
-        # Sections as string = new semantic path
-        self.mock_router.route.return_value = self.ParseResult(sections="# Heading\n\nContent", is_markdown=True)
-        self.mock_semantic.chunk.return_value = [{"content": "semantic result", "header_path": "/Heading/"}]
+# adapt_docling_output()
 
-        parser_config = {"layout_recognizer": "Docling", "use_semantic_chunking": True}
 
-        self.mock_semantic.chunk.reset_mock()
+@pytest.mark.parametrize(
+    "sections, tables, parser_config, expected_content",
+    [
+        # New string format (semantic mode) passes through unchanged
+        ("# Heading\n\nParagraph text here.", [], {"layout_recognizer": "Docling"}, "# Heading\n\nParagraph text here."),
+        ("# Header\nText", [{"type": "table", "content": "| A | B |\n|---|---|\n| 1 | 2 |"}], {"layout_recognizer": "Docling"}, "# Header\nText"),
+        # Legacy list format is joined with newlines
+        (["# Heading", "Paragraph text here."], [], {"layout_recognizer": "Docling"}, "# Heading\nParagraph text here."),
+        ("", [], {}, ""),
+        ([], [], {}, ""),
+    ],
+    ids=["string", "with_tables", "legacy_list", "empty_string", "empty_list"],
+)
+def test_adapt_docling_output(orchestrator_ctx, sections, tables, parser_config, expected_content):
+    result = orchestrator_ctx.orchestrator.adapt_docling_output(sections, tables, parser_config)
 
-        # The decorator patch on rag.app.orchestrator.Semantic is sufficient
-        # No need for redundant inner patch of rag.app.templates.semantic.Semantic
-        res = self.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
+    assert isinstance(result, orchestrator_ctx.StandardizedDocument)
+    assert result.content == expected_content
+    assert result.metadata["parser"] == "docling"
+    assert result.metadata["layout_recognizer"] == "Docling"
+    assert result.metadata["tables"] == tables
 
-        # Should use Semantic template
-        self.mock_semantic.chunk.assert_called_once()
 
-        # Verify the result contains the expected semantic chunk
-        self.assertEqual(len(res), 1)
-        self.assertEqual(res[0]["content"], "semantic result")
-        self.assertEqual(res[0]["header_path"], "/Heading/")
+def test_adapter_preserves_elements_empty(orchestrator_ctx):
+    """Test that elements list is empty initially and then raises if accessed without implementation."""
+    result = orchestrator_ctx.orchestrator.adapt_docling_output("test", [], {})
+    # In current design, _elements=None leads to _parse_elements which raises NotImplementedError
+    with pytest.raises(NotImplementedError):
+        _ = result.elements
 
-    def test_legacy_path_without_semantic_flag(self):
-        """Test that without use_semantic_chunking flag, General is used."""
-        self.mock_router.route.return_value = self.ParseResult(sections="# Heading\n\nContent")
-        self.mock_general.chunk.return_value = [{"content": "general result"}]
 
-        # No use_semantic_chunking flag
-        parser_config = {"layout_recognizer": "Docling"}
+# Semantic template routing in chunk()
 
-        self.mock_general.chunk.reset_mock()
 
-        res = self.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
+def test_legacy_path_with_list_sections(orchestrator_ctx, orch_patches):
+    """Test that list sections still route to General template."""
+    # Sections as list = legacy path
+    orch_patches.router.route.return_value = orchestrator_ctx.ParseResult(sections=["section1", "section2"], is_markdown=False)
+    orch_patches.general.chunk.return_value = [{"content": "general result"}]
 
-        # Should use General because flag is not set
-        self.mock_general.chunk.assert_called_once()
-        self.assertEqual(res, [{"content": "general result"}])
+    parser_config = {"layout_recognizer": "Docling", "use_semantic_chunking": False}
 
+    orchestrator_ctx.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
 
-if __name__ == "__main__":
-    unittest.main()
+    # Should use General because sections is a list, not string
+    orch_patches.general.chunk.assert_called_once()
+
+
+def test_semantic_path_with_string_sections(orchestrator_ctx, orch_patches):
+    """Test that string sections with use_semantic_chunking routes to Semantic template."""
+    # Sections as string = new semantic path
+    orch_patches.router.route.return_value = orchestrator_ctx.ParseResult(sections="# Heading\n\nContent", is_markdown=True)
+    orch_patches.semantic.chunk.return_value = [{"content": "semantic result", "header_path": "/Heading/"}]
+
+    parser_config = {"layout_recognizer": "Docling", "use_semantic_chunking": True}
+
+    res = orchestrator_ctx.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
+
+    # Should use Semantic template
+    orch_patches.semantic.chunk.assert_called_once()
+
+    # Verify the result contains the expected semantic chunk
+    assert len(res) == 1
+    assert res[0]["content"] == "semantic result"
+    assert res[0]["header_path"] == "/Heading/"
+
+
+def test_legacy_path_without_semantic_flag(orchestrator_ctx, orch_patches):
+    """Test that without use_semantic_chunking flag, General is used."""
+    orch_patches.router.route.return_value = orchestrator_ctx.ParseResult(sections="# Heading\n\nContent")
+    orch_patches.general.chunk.return_value = [{"content": "general result"}]
+
+    # No use_semantic_chunking flag
+    parser_config = {"layout_recognizer": "Docling"}
+
+    res = orchestrator_ctx.orchestrator.chunk("test.pdf", b"content", parser_config=parser_config)
+
+    # Should use General because flag is not set
+    orch_patches.general.chunk.assert_called_once()
+    assert res == [{"content": "general result"}]
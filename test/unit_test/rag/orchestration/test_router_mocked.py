@@ -1,57 +1,73 @@
-import sys
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
+
+from test.mocks.mock_utils import patch_modules
 
 # List of modules to mock
-HEAVY_DEPENDENCIES = [
-    "cv2",
-    "xgboost",
-    "pdfplumber",
-    "pdfminer",
-    "pdfminer.high_level",
-    "pdfminer.layout",
-    "pypdf",
-    "PyPDF2",
-    "olefile",
-    "PIL",
-    "PIL.Image",
-    "openpyxl",
-    "pandas",
-    # Tencent Cloud
-    "tencentcloud",
-    "tencentcloud.common",
-    "tencentcloud.common.credential",
-    "tencentcloud.common.profile",
-    "tencentcloud.common.profile.client_profile",
-    "tencentcloud.common.profile.http_profile",
-    "tencentcloud.common.exception",
-    "tencentcloud.common.exception.tencent_cloud_sdk_exception",
-    "tencentcloud.lkeap",
-    "tencentcloud.lkeap.v20240522",
-    "tencentcloud.lkeap.v20240522.lkeap_client",
-    "tencentcloud.lkeap.v20240522.models",
-    # DeepDoc internal
-    "deepdoc",
-    "deepdoc.vision",
-    "rag.parsers.deepdoc.vision",
-    # Service dependencies
-    "api.db.services.llm_service",
-    "api.db.services.tenant_llm_service",
-]
-
-
-@pytest.fixture
+HEAVY_DEPENDENCIES = frozenset(
+    (
+        "cv2",
+        "xgboost",
+        "pdfplumber",
+        "pdfminer",
+        "pdfminer.high_level",
+        "pdfminer.layout",
+        "pypdf",
+        "PyPDF2",
+        "olefile",
+        "PIL",
+        "PIL.Image",
+        "openpyxl",
+        "pandas",
+        # Tencent Cloud
+        "tencentcloud",
+        "tencentcloud.common",
+        "tencentcloud.common.credential",
+        "tencentcloud.common.profile",
+        "tencentcloud.common.profile.client_profile",
+        "tencentcloud.common.profile.http_profile",
+        "tencentcloud.common.exception",
+        "tencentcloud.common.exception.tencent_cloud_sdk_exception",
+        "tencentcloud.lkeap",
+        "tencentcloud.lkeap.v20240522",
+        "tencentcloud.lkeap.v20240522.lkeap_client",
+        "tencentcloud.lkeap.v20240522.models",
+        # DeepDoc internal
+        "deepdoc",
+        "deepdoc.vision",
+        "rag.parsers.deepdoc.vision",
+        # Service dependencies
+        "api.db.services.llm_service",
+        "api.db.services.tenant_llm_service",
+    )
+)
+
+
+# Stubs are filled in once by mock_heavy_deps and shared by every test in this module.
+# They only need to satisfy attribute lookups, so plain Mock is enough.
+_HEAVY_STUBS = dict.fromkeys(HEAVY_DEPENDENCIES)
+
+
+@pytest.fixture(scope="module", autouse=True)
 def mock_heavy_deps():
     """
-    Fixture to mock heavy dependencies in sys.modules for the duration of the test.
+    Fixture to mock heavy dependencies in sys.modules for the tests in this module.
     """
-    with patch.dict(sys.modules):
-        for dep in HEAVY_DEPENDENCIES:
-            sys.modules[dep] = MagicMock()
+    for dep in _HEAVY_STUBS:
+        _HEAVY_STUBS[dep] = Mock()
+    with patch_modules(_HEAVY_STUBS, purge=("rag.orchestration.router",)):
         yield
 
 
-def test_router_dispatch(mock_heavy_deps):
+@pytest.fixture(scope="module")
+def router_cls(mock_heavy_deps):
+    """UniversalRouter, imported once after the heavy dependencies are stubbed."""
+    from rag.orchestration.router import UniversalRouter
+
+    return UniversalRouter
+
+
+def test_router_dispatch(router_cls):
     """
     Verifies that UniversalRouter correctly dispatches to DeepDocParser
     and that DeepDocParser calls the underlying logic (which is mocked).
@@ -59,17 +75,6 @@ def test_router_dispatch(mock_heavy_deps):
     without requiring installation of cv2, etc.
     """
 
-    # Import inside the test function AFTER mocking takes effect
-    # Note: If these modules were already imported by other tests,
-    # reload might be necessary, but patch.dict handles safe rollback.
-    try:
-        from rag.orchestration.router import UniversalRouter
-
-        # UniversalRouter is imported successfully
-        # Ensure we can import it without error
-    except ImportError as e:
-        pytest.fail(f"Import failed with mocked dependencies: {e}")
-
     # Setup Keyword Arguments for routing
     filename = "test.pdf"
     binary = b"dummy content"
@@ -78,16 +83,16 @@ def test_router_dispatch(mock_heavy_deps):
     callback = MagicMock()
 
     # Verify that UniversalRouter correctly routes to DeepDocParser.
-    # We patch the DeepDocParser class in rag.orchestration.router since it is imported there.
-    # We must ensure rag.orchestration.router is imported first (which we did above).
-    with patch("rag.orchestration.router.DeepDocParser") as MockDeepDocParser:
+    # The router resolves DeepDocParser from its defining module on each dispatch,
+    # so the class is patched there rather than on rag.orchestration.router.
+    with patch("rag.parsers.deepdoc_client.DeepDocParser") as MockDeepDocParser:
         # Configure the mock to return a known structure (sections, tables, pdf_parser)
         expected_sections = ["mock_section"]
         expected_tables = ["mock_table"]
         expected_parser = MagicMock()
         MockDeepDocParser.return_value.parse_pdf.return_value = (expected_sections, expected_tables, expected_parser)
 
-        res = UniversalRouter.route(filename=filename, binary=binary, parser_config={"layout_recognize": "DeepDOC"}, callback=callback)
+        res = router_cls.route(filename=filename, binary=binary, parser_config={"layout_recognize": "DeepDOC"}, callback=callback)
 
         # Assertions
         # 1. Check if DeepDocParser was instantiated and used
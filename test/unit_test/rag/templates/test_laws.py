@@ -1,83 +1,72 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from functools import lru_cache
+from unittest.mock import MagicMock
 import sys
 
+from test.mocks.mock_utils import patch_modules
+from test.mocks.template_mocks import PREBUILT
+
 
 # Project root is automatically added to sys.path by test/unit_test/conftest.py
 
 
 # ----------------- MOCK SETUP START -----------------
+# tika is installed once for the whole module; tests only reset its call history.
+_tika_parser_mock = MagicMock()
+_tika_mock = MagicMock(parser=_tika_parser_mock)
+_TIKA_STUBS = {"tika": _tika_mock, "tika.parser": _tika_parser_mock}
 # Save original sys.modules state for cleanup
+_original_tika = {}
+
+
+def setUpModule():
+    for name, stub in _TIKA_STUBS.items():
+        _original_tika[name] = sys.modules.get(name)
+        sys.modules[name] = stub
+
+
+def tearDownModule():
+    for name, original in _original_tika.items():
+        if original is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = original
+
+
+# Plain stand-in for a page image; Pdf only reads its size
+_FAKE_PAGE = SimpleNamespace(size=(100, 100))
+
+
+@lru_cache(maxsize=None)
+def _laws():
+    """Import rag.templates.laws on first use, after the stubs are installed."""
+    from rag.templates import laws
+
+    return laws
 
 
 class TestLawsTemplate(unittest.TestCase):
     """Tests for the laws template to verify callback safety and error handling."""
 
+    @classmethod
+    def setUpClass(cls):
+        # Install the shared stubs once per class; the template itself is imported
+        # once by _laws(). Only the stubbed keys are restored afterwards, so real
+        # modules first imported here (e.g. numpy) stay loaded for later tests.
+        cls.patcher = patch_modules(PREBUILT, purge=("rag.templates.laws",))
+        cls.patcher.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.patcher.__exit__(None, None, None)
+
     def setUp(self):
-        self.mock_modules = {
-            "docx": MagicMock(),
-            "docx.Document": MagicMock(),
-            "docx.opc.exceptions": MagicMock(),
-            "docx.oxml": MagicMock(),
-            "docx.image": MagicMock(),
-            "docx.image.exceptions": MagicMock(),
-            "docx.opc": MagicMock(),
-            "docx.opc.pkgreader": MagicMock(),
-            "docx.opc.oxml": MagicMock(),
-            "docx.table": MagicMock(),
-            "docx.text": MagicMock(),
-            "docx.text.paragraph": MagicMock(),
-            "bs4": MagicMock(),
-            "bs4.BeautifulSoup": MagicMock(),
-            "bs4.NavigableString": MagicMock(),
-            "bs4.Tag": MagicMock(),
-            "bs4.Comment": MagicMock(),
-            "huggingface_hub": MagicMock(),
-            "pdfplumber": MagicMock(),
-            "xgboost": MagicMock(),
-            "sklearn": MagicMock(),
-            "sklearn.cluster": MagicMock(),
-            "sklearn.metrics": MagicMock(),
-            "pypdf": MagicMock(),
-            "pptx": MagicMock(),  # Mock pptx manually here if needed or rely on conftest
-            "deepdoc": MagicMock(),
-            "deepdoc.parser": MagicMock(),
-            "deepdoc.vision": MagicMock(),
-            "common": MagicMock(),
-            "common.constants": MagicMock(),
-            "common.parser_config_utils": MagicMock(),
-            "common.token_utils": MagicMock(),  # Ensure this is mocked!
-            "rag.nlp": MagicMock(),
-            "rag.orchestration.router": MagicMock(),
-        }
-
-        # Setup specific mocks
-        self.mock_modules["rag.nlp"].bullets_category.return_value = []
-        self.mock_modules["rag.nlp"].docx_question_level.return_value = (1, "text")
-
-        self.patcher = patch.dict(sys.modules, self.mock_modules)
-        self.patcher.start()
-
-        # Import after patching
-        from rag.templates import laws
-
-        self.laws = laws
-
-    def tearDown(self):
-        self.patcher.stop()
-
-    @staticmethod
-    def _doc_search_side_effect(pat, f, flags=0):
-        """Shared helper for mocking re.search to match .doc files."""
-        if pat == r"\.doc$":
-            match_mock = MagicMock()
-            match_mock.group.return_value = ".doc"
-            return match_mock
-        return None
+        _tika_parser_mock.reset_mock()
 
     def test_docx_str_safe(self):
         """Verify Docx.__str__ is removed or safe."""
-        docx = self.laws.Docx()
+        docx = _laws().Docx()
         s = str(docx)
         self.assertIsInstance(s, str)
         # Should NOT contain old broken format
@@ -86,13 +75,7 @@ class TestLawsTemplate(unittest.TestCase):
 
     def test_pdf_callback_none_safe(self):
         """Verify Pdf.__call__ works with callback=None."""
-        # Force set the setting to avoid MagicMock comparison error
-        if "common" in sys.modules and hasattr(sys.modules["common"], "settings"):
-            sys.modules["common"].settings.PARALLEL_DEVICES = 0
-        if "common.settings" in sys.modules:
-            sys.modules["common.settings"].PARALLEL_DEVICES = 0
-
-        pdf = self.laws.Pdf()
+        pdf = _laws().Pdf()
         # Mock internal methods that might rely on complex dependencies (like DeepDOC layouter)
         pdf.__images__ = MagicMock()
         pdf._layouts_rec = MagicMock()
@@ -102,59 +85,42 @@ class TestLawsTemplate(unittest.TestCase):
         pdf._naive_vertical_merge = MagicMock()
         pdf.boxes = [{"text": "dummy", "x0": 0, "x1": 10, "top": 0, "bottom": 10, "layoutno": "text", "page_number": 1}]
         pdf.page_cum_height = [0]
-        pdf.page_images = [MagicMock()]
-        pdf.page_images[0].size = (100, 100)
+        pdf.page_images = [_FAKE_PAGE]
 
         # The test ensures no exception is raised when callback is None
         pdf("dummy.pdf", binary=b"dummy", callback=None)
 
     def test_doc_binary_none_uses_from_file(self):
         """Verify .doc parsing handles None binary correctly by using from_file."""
-        with patch("rag.templates.laws.re.search") as mock_re_search:
-            mock_re_search.side_effect = self._doc_search_side_effect
-
-            # Create a consistent tika parser mock
-            tika_parser_mock = MagicMock()
-            tika_parser_mock.from_file.return_value = {"content": "parsed content"}
-            tika_mock = MagicMock()
-            tika_mock.parser = tika_parser_mock
+        _tika_parser_mock.from_file.return_value = {"content": "parsed content"}
 
-            with patch.dict(sys.modules, {"tika": tika_mock, "tika.parser": tika_parser_mock}):
-                self.laws.chunk("test.doc", binary=None, callback=lambda *args, **kwargs: None)
+        _laws().chunk("test.doc", binary=None, callback=lambda *args, **kwargs: None)
 
-                tika_parser_mock.from_file.assert_called_with("test.doc")
-                tika_parser_mock.from_buffer.assert_not_called()
+        _tika_parser_mock.from_file.assert_called_with("test.doc")
+        _tika_parser_mock.from_buffer.assert_not_called()
 
     def test_doc_binary_bytes_uses_from_buffer(self):
         """Verify .doc parsing handles bytes binary correctly by using from_buffer."""
-        with patch("rag.templates.laws.re.search") as mock_re_search:
-            mock_re_search.side_effect = self._doc_search_side_effect
-
-            # Create a consistent tika parser mock
-            tika_parser_mock = MagicMock()
-            tika_parser_mock.from_buffer.return_value = {"content": "parsed content"}
-            tika_mock = MagicMock()
-            tika_mock.parser = tika_parser_mock
+        _tika_parser_mock.from_buffer.return_value = {"content": "parsed content"}
 
-            with patch.dict(sys.modules, {"tika": tika_mock, "tika.parser": tika_parser_mock}):
-                self.laws.chunk("test.doc", binary=b"some bytes", callback=lambda *args, **kwargs: None)
+        _laws().chunk("test.doc", binary=b"some bytes", callback=lambda *args, **kwargs: None)
 
-                tika_parser_mock.from_buffer.assert_called_once()
-                args, _ = tika_parser_mock.from_buffer.call_args
-                self.assertIsInstance(args[0], bytes)
+        _tika_parser_mock.from_buffer.assert_called_once()
+        args, _ = _tika_parser_mock.from_buffer.call_args
+        self.assertIsInstance(args[0], bytes)
 
     def test_not_implemented_error_lists_all_formats(self):
         """Verify NotImplementedError message lists all supported formats."""
         with self.assertRaises(NotImplementedError) as cm:
-            self.laws.chunk("unsupported.xyz", callback=lambda *args, **kwargs: None)
+            _laws().chunk("unsupported.xyz", callback=lambda *args, **kwargs: None)
 
         msg = str(cm.exception)
-        expected = ["doc", "docx", "pdf", "txt", "md", "markdown", "mdx", "htm", "html"]
-        for ext in expected:
-            self.assertIn(ext, msg, f"Message missing extension: {ext}")
+        expected = ("doc", "docx", "pdf", "txt", "md", "markdown", "mdx", "htm", "html")
+        missing = [ext for ext in expected if ext not in msg]
+        self.assertFalse(missing, f"Message missing extensions: {missing}")
 
 
-# Removed teardown_module as it is no longer needed with setUp/patcher
+# Removed teardown_module as it is no longer needed with setUpClass/patcher
 
 
 if __name__ == "__main__":
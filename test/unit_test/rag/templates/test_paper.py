@@ -1,47 +1,103 @@
 import unittest
+from types import SimpleNamespace
+from functools import lru_cache
 
-from unittest.mock import MagicMock, patch
-from test.mocks.mock_utils import setup_mocks
+from unittest.mock import DEFAULT, patch
+from test.mocks.mock_utils import scoped_mocks
 
-# Set up system mocks
-setup_mocks()
+# Plain stand-ins where the code under test only reads attributes
+_FAKE_PAGE = SimpleNamespace(size=(100, 100))
+_CROPPED_IMAGE = object()
 
 
-from rag.templates import paper
+class _StubPdfBase:
+    """Canned PdfParser steps for Pdf.__call__; no test inspects their calls."""
+
+    @staticmethod
+    def __images__(*args, **kwargs):
+        pass
+
+    _layouts_rec = _table_transformer_job = _text_merge = _concat_downward = _filter_forpages = __images__
+
+    @staticmethod
+    def _extract_table_figure(*args, **kwargs):
+        return []
+
+    @staticmethod
+    def _line_tag(*args, **kwargs):
+        return "[tag]"
+
+
+_STUB_PDF_METHODS = (
+    "__images__",
+    "_layouts_rec",
+    "_table_transformer_job",
+    "_text_merge",
+    "_concat_downward",
+    "_filter_forpages",
+    "_extract_table_figure",
+    "_line_tag",
+)
+
+
+@lru_cache(maxsize=None)
+def _paper():
+    """Import rag.templates.paper on first use rather than at collection time."""
+    from rag.templates import paper
+
+    return paper
 
 
 class TestPaperTemplate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Set up system mocks for this class only
+        cls.enterClassContext(scoped_mocks(purge=("rag.templates.paper",)))
+
+        # Patch the Pdf class once so that any instantiation within the tests returns our mock
+        cls.pdf_patcher = patch.object(_paper(), "Pdf")
+        cls.mock_pdf_cls = cls.pdf_patcher.start()
+
+        # Configure the prototype instance with the required attributes once
+        cls._prototype = cls.mock_pdf_cls.return_value
+        for name in _STUB_PDF_METHODS:
+            setattr(cls._prototype, name, getattr(_StubPdfBase, name))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pdf_patcher.stop()
+
     def setUp(self):
-        # Patch the Pdf class so that any instantiation within the test or setup returns our mock
-        self.pdf_patcher = patch("rag.templates.paper.Pdf")
-        self.mock_pdf_cls = self.pdf_patcher.start()
-        self.addCleanup(self.pdf_patcher.stop)
-
-        # Configure the mock instance
-        self.mock_pdf_instance = self.mock_pdf_cls.return_value
-
-        # Configure the mock with required attributes
-        self.mock_pdf_instance.__images__ = MagicMock()
-        self.mock_pdf_instance._layouts_rec = MagicMock()
-        self.mock_pdf_instance._table_transformer_job = MagicMock()
-        self.mock_pdf_instance._text_merge = MagicMock()
-        self.mock_pdf_instance._extract_table_figure = MagicMock(return_value=[])
-        self.mock_pdf_instance._concat_downward = MagicMock()
-        self.mock_pdf_instance._filter_forpages = MagicMock()
-        self.mock_pdf_instance._line_tag = MagicMock(return_value="[tag]")
-        self.mock_pdf_instance.total_page = 1
-        self.mock_pdf_instance.boxes = []
-        self.mock_pdf_instance.page_images = []
-
-        # Use the mock instance
-        self.pdf = self.mock_pdf_instance
+        # Reuse the prototype; only clear call history and the state tests overwrite
+        self.pdf = self._prototype
+        self.pdf.reset_mock(return_value=True, side_effect=True)
+        self.pdf.total_page = 1
+        self.pdf.boxes = []
+        self.pdf.page_images = []
+        # pdf_parser is the Pdf mock inside chunk(): tokenize_chunks needs crop() to unpack,
+        # and tokenize needs remove_tag() to return the text rather than a Mock
+        self.pdf.crop.return_value = (_CROPPED_IMAGE, [])
+        self.pdf.remove_tag.side_effect = lambda x: x
+
+        # Collaborators every chunk() test stubs the same way
+        chunk_patcher = patch.multiple(
+            "rag.templates.paper",
+            vision_figure_parser_pdf_wrapper=DEFAULT,
+            rag_tokenizer=DEFAULT,
+            normalize_layout_recognizer=DEFAULT,
+        )
+        mocks = chunk_patcher.start()
+        self.addCleanup(chunk_patcher.stop)
+        mocks["normalize_layout_recognizer"].return_value = ("DeepDOC", "model")
+        mocks["rag_tokenizer"].tokenize.return_value = []
+        mocks["rag_tokenizer"].fine_grained_tokenize.return_value = []
+        mocks["vision_figure_parser_pdf_wrapper"].return_value = []
 
     def test_pdf_call_callback_none(self):
         """Verify Pdf.__call__ works when callback is None"""
         # Mock methods that might fail if called with real hardware/models
         self.pdf.boxes = [{"text": "dummy", "x0": 0, "x1": 10, "layoutno": "text"}]
-        self.pdf.page_images = [MagicMock()]
-        self.pdf.page_images[0].size = (100, 100)
+        self.pdf.page_images = [_FAKE_PAGE]
         self.pdf.total_page = 1
 
         # Call directly, any exception will fail the test
@@ -59,80 +115,40 @@ class TestPaperTemplate(unittest.TestCase):
         self.pdf.page_images = []
         self.pdf.boxes = [{"text": "dummy", "x0": 0, "x1": 10, "layoutno": "text"}]
         # Call the real __call__ method using the mock object as 'self'
-        paper.Pdf.__call__(self.pdf, "test.pdf", callback=None)
+        _paper().Pdf.__call__(self.pdf, "test.pdf", callback=None)
 
-    @patch("rag.templates.paper.rag_tokenizer")
-    @patch("rag.templates.paper.vision_figure_parser_pdf_wrapper")
-    @patch("rag.templates.paper.normalize_layout_recognizer")
-    def test_chunk_callback_none(self, mock_normalize, mock_vision, mock_tok):
+    def test_chunk_callback_none(self):
         """Verify chunk() works when callback is None"""
-        mock_normalize.return_value = ("DeepDOC", "model")
-        mock_tok.tokenize.return_value = []
-        mock_tok.fine_grained_tokenize.return_value = []
-
-        # Configure the mock Pdf instance returned by the class constructor logic
-        # Since Pdf is already patched at the class level in setUp, we use self.pdf
-        mock_pdf_instance = self.pdf
         # Add required keys: authors, title, abstract
-        mock_pdf_instance.return_value = {"sections": [], "tables": [], "authors": "", "title": "", "abstract": ""}
-
-        mock_vision.return_value = []
+        self.pdf.return_value = {"sections": [], "tables": [], "authors": "", "title": "", "abstract": ""}
 
         # Call should not raise exception
-        paper.chunk("test.pdf", callback=None)
-
-    @patch("rag.templates.paper.vision_figure_parser_pdf_wrapper")
-    @patch("rag.templates.paper.rag_tokenizer")
-    @patch("rag.templates.paper.normalize_layout_recognizer")
-    @patch("rag.templates.paper.title_frequency")
-    @patch("rag.templates.paper.bullets_category")
-    def test_chunk_logging_defensive(self, mock_bullets, mock_title, mock_normalize, mock_tok, mock_vision):
-        """Verify chunk() logging handles both tuples and strings in sorted_sections"""
-        mock_bullets.return_value = []
-        mock_title.return_value = (0, [0, 0])
-        mock_normalize.return_value = ("DeepDOC", "model")
-        mock_tok.tokenize.return_value = []
-        mock_tok.fine_grained_tokenize.return_value = []
-        mock_vision.return_value = []
-
-        test_cases = [("tuple", [("text1", "label1"), ("text2", "label2")]), ("string", ["text1", "text2"])]
-
-        for name, sorted_sections in test_cases:
-            with self.subTest(name=name):
-                # Setup specific return value for this case
-                mock_pdf_instance = self.pdf
-                mock_pdf_instance.return_value = {"sections": sorted_sections, "tables": [], "authors": "", "title": "", "abstract": ""}
-                # Fix ValueError in tokenize_chunks -> pdf_parser.crop
-                # pdf_parser is the mock_pdf_instance in this context
-                mock_pdf_instance.crop.return_value = (MagicMock(), [])
-
-                # Fix TypeError in tokenize -> re.sub because remove_tag returned a Mock
-                mock_pdf_instance.remove_tag.side_effect = lambda x: x
-
-                paper.chunk("test.pdf")
-                # No exception raised indicates success
-
-    @patch("rag.templates.paper.vision_figure_parser_pdf_wrapper")
-    @patch("rag.templates.paper.rag_tokenizer")
-    @patch("rag.templates.paper.normalize_layout_recognizer")
-    @patch("rag.templates.paper.title_frequency")
-    @patch("rag.templates.paper.bullets_category")
-    def test_chunk_mismatch_error(self, mock_bullets, mock_title, mock_normalize, mock_tok, mock_vision):
-        """Verify chunk() raises ValueError when sections and levels mismatch"""
-        mock_bullets.return_value = []
-        mock_title.return_value = (0, [0])
-        mock_normalize.return_value = ("DeepDOC", "model")
+        _paper().chunk("test.pdf", callback=None)
+
+    @patch.multiple("rag.templates.paper", title_frequency=DEFAULT, bullets_category=DEFAULT)
+    def _chunk_sorted_sections(self, sorted_sections, levels=None, **mocks):
+        """Run chunk() with the given sorted_sections and title levels (one per section by default)."""
+        mocks["bullets_category"].return_value = []
+        mocks["title_frequency"].return_value = (0, [0] * len(sorted_sections) if levels is None else levels)
+
+        self.pdf.return_value = {"sections": sorted_sections, "tables": [], "authors": "", "title": "", "abstract": ""}
 
-        sorted_sections = ["text1", "text2"]
-        mock_pdf = self.pdf
-        mock_pdf.return_value = {"sections": sorted_sections, "tables": [], "authors": "", "title": "", "abstract": ""}
+        _paper().chunk("test.pdf")
 
-        mock_tok.tokenize.return_value = []
-        mock_tok.fine_grained_tokenize.return_value = []
-        mock_vision.return_value = []
+    def test_chunk_logging_defensive_tuple(self):
+        """Verify chunk() logging handles tuples in sorted_sections"""
+        self._chunk_sorted_sections([("text1", "label1"), ("text2", "label2")])
+        # No exception raised indicates success
 
+    def test_chunk_logging_defensive_string(self):
+        """Verify chunk() logging handles strings in sorted_sections"""
+        self._chunk_sorted_sections(["text1", "text2"])
+        # No exception raised indicates success
+
+    def test_chunk_mismatch_error(self):
+        """Verify chunk() raises ValueError when sections and levels mismatch"""
         with self.assertRaisesRegex(ValueError, "Mismatch between number of sections"):
-            paper.chunk("test.pdf")
+            self._chunk_sorted_sections(["text1", "text2"], levels=[0])
 
 
 if __name__ == "__main__":
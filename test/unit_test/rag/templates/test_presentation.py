@@ -6,7 +6,7 @@ import types
 # Project root is automatically added to sys.path by test/unit_test/conftest.py
 
 # ----------------- MOCK SETUP START -----------------
-# Save original sys.modules state for cleanup
+# Modules replaced while the tests run; originals are restored afterwards
 _MOCKED_MODULES = [
     "PIL",
     "PIL.Image",
@@ -29,27 +29,23 @@ _INTERMEDIATE_PACKAGES = [
     "rag.templates",
 ]
 
-_original_modules = {mod: sys.modules.get(mod) for mod in _MOCKED_MODULES}
-_original_intermediate_packages = {pkg: sys.modules.get(pkg) for pkg in _INTERMEDIATE_PACKAGES}
-
-# Mock PIL with a working Image.open
-mock_pil_image_module = MagicMock()
-mock_pil_image = MagicMock()
-mock_pil_image.copy.return_value = MagicMock()  # Return a mock image object
-mock_pil_image_module.open.return_value = mock_pil_image
-sys.modules["PIL"] = MagicMock()
-sys.modules["PIL"].__version__ = "10.0.0"
-sys.modules["PIL.Image"] = mock_pil_image_module
-
-sys.modules["PyPDF2"] = MagicMock()
-
 # Mock aspose.slides with proper slide structure
 # The key is to make the presentation object work as a context manager
 # and have its slides attribute be a list that can be sliced
 
 
+# Built on first use and then shared: no test mutates the slides, so a single
+# presentation is enough. Call _reset_mock_presentation() if a test ever needs a
+# pristine one.
+_cached_presentation = None
+
+
 def create_mock_presentation(*args, **kwargs):
-    """Factory function that creates a new presentation mock each time."""
+    """Factory for slides.Presentation that builds the presentation mock once."""
+    global _cached_presentation
+    if _cached_presentation is not None:
+        return _cached_presentation
+
     mock_slide = MagicMock()
     mock_thumbnail = MagicMock()
     mock_thumbnail.save = MagicMock()
@@ -62,9 +58,16 @@ def create_mock_presentation(*args, **kwargs):
     mock_presentation.__enter__ = lambda self: mock_presentation
     # __exit__ is called with self, exc_type, exc_value, traceback
     mock_presentation.__exit__ = lambda self, *args: False
+    _cached_presentation = mock_presentation
     return mock_presentation
 
 
+def _reset_mock_presentation():
+    """Drop the cached presentation so the next Presentation() call builds a fresh one."""
+    global _cached_presentation
+    _cached_presentation = None
+
+
 # Create proper module objects instead of MagicMock to avoid interference
 # The parent aspose module must also be a proper module, otherwise Python's import
 # mechanism will access MagicMock attributes instead of sys.modules entries
@@ -75,15 +78,9 @@ mock_aspose_slides.Presentation = MagicMock(side_effect=create_mock_presentation
 mock_aspose.slides = mock_aspose_slides  # Link the module to the parent
 
 mock_aspose_drawing = types.ModuleType("aspose.pydrawing")
-mock_aspose_drawing.imaging = MagicMock()
-mock_aspose_drawing.imaging.ImageFormat = MagicMock()
-mock_aspose_drawing.imaging.ImageFormat.jpeg = "jpeg"
+mock_aspose_drawing.imaging = types.SimpleNamespace(ImageFormat=types.SimpleNamespace(jpeg="jpeg"))
 mock_aspose.pydrawing = mock_aspose_drawing  # Link the module to the parent
 
-sys.modules["aspose"] = mock_aspose
-sys.modules["aspose.slides"] = mock_aspose_slides
-sys.modules["aspose.pydrawing"] = mock_aspose_drawing
-
 
 class MockPdfParser:
     def __init__(self):
@@ -122,58 +119,128 @@ mock_deepdoc = MagicMock()
 mock_deepdoc.parser.PdfParser = MockPdfParser
 mock_deepdoc.parser.PptParser = MockPptParser
 mock_deepdoc.parser.PlainParser = MockPlainParser
-sys.modules["deepdoc"] = mock_deepdoc
-sys.modules["deepdoc.parser"] = mock_deepdoc.parser
 
-# All global mocks are removed and will be handled by patch.dict in setUp.
+
+def _install_presentation_mocks():
+    """Install the PIL/PyPDF2/aspose/deepdoc stubs and return the state they replaced.
+
+    Called from setUpClass so that collecting this file (e.g. under ``pytest -k``)
+    does not touch sys.modules.
+    """
+    original_modules = {mod: sys.modules.get(mod) for mod in _MOCKED_MODULES}
+    original_intermediate_packages = {pkg: sys.modules.get(pkg) for pkg in _INTERMEDIATE_PACKAGES}
+
+    # Mock PIL with a working Image.open
+    mock_pil_image_module = MagicMock()
+    mock_pil_image = MagicMock()
+    mock_pil_image.copy.return_value = MagicMock()  # Return a mock image object
+    mock_pil_image_module.open.return_value = mock_pil_image
+    sys.modules["PIL"] = MagicMock()
+    sys.modules["PIL"].__version__ = "10.0.0"
+    sys.modules["PIL.Image"] = mock_pil_image_module
+
+    sys.modules["PyPDF2"] = MagicMock()
+
+    sys.modules["aspose"] = mock_aspose
+    sys.modules["aspose.slides"] = mock_aspose_slides
+    sys.modules["aspose.pydrawing"] = mock_aspose_drawing
+
+    sys.modules["deepdoc"] = mock_deepdoc
+    sys.modules["deepdoc.parser"] = mock_deepdoc.parser
+
+    return original_modules, original_intermediate_packages
+
+
+def _restore_presentation_mocks(original_modules, original_intermediate_packages):
+    """Restore sys.modules to the state captured by _install_presentation_mocks."""
+    # Remove the imported presentation module to allow fresh imports in other tests
+    if "rag.templates.presentation" in sys.modules:
+        del sys.modules["rag.templates.presentation"]
+
+    # Restore original sys.modules entries
+    for mod, original_value in original_modules.items():
+        if original_value is None:
+            # Module didn't exist originally, remove it
+            sys.modules.pop(mod, None)
+        else:
+            # Restore original module
+            sys.modules[mod] = original_value
+
+    # Restore intermediate package names to ensure complete isolation
+    # Process in reverse order (deepest to shallowest) to avoid parent/child issues
+    for pkg in reversed(_INTERMEDIATE_PACKAGES):
+        original_value = original_intermediate_packages.get(pkg)
+        if original_value is None:
+            # Package didn't exist originally, remove it
+            sys.modules.pop(pkg, None)
+        else:
+            # Restore original package
+            sys.modules[pkg] = original_value
+
+
+# Stub modules for the presentation template, built once and shared by every test.
+# patch.dict only snapshots sys.modules keys, so reusing the same stubs is cheap.
+_SHARED_MOCK_MODULES = {
+    "rag.app.format_parsers": MagicMock(),
+    "rag.orchestration.router": MagicMock(PARSERS={}),
+    "rag.templates.general": MagicMock(),
+    "rag.templates.semantic": MagicMock(),
+    "rag.nlp": MagicMock(),
+    "rag.utils.file_utils": MagicMock(),
+    "common": MagicMock(),
+    "common.settings": MagicMock(),
+    "common.parser_config_utils": MagicMock(),
+    "api.db.services.llm_service": MagicMock(),
+    "rag.parsers": MagicMock(),
+    "rag.parsers.deepdoc": MagicMock(),
+    "rag.parsers.deepdoc.ppt_parser": MagicMock(),
+    "pptx": MagicMock(),
+    "deepdoc": MagicMock(),
+    "deepdoc.vision": MagicMock(),
+}
+# Real stand-in base classes, so Pdf/Ppt are genuine classes rather than MagicMocks
+# whose shared call state would leak between tests now that the import is class-wide
+_SHARED_MOCK_MODULES["rag.parsers"].PdfParser = MockPdfParser
+_SHARED_MOCK_MODULES["rag.parsers"].PptParser = MockPptParser
+_SHARED_MOCK_MODULES["rag.parsers"].PlainParser = MockPlainParser
+# normalize_layout_recognizer must return a valid (recognizer, model) tuple
+_SHARED_MOCK_MODULES["common.parser_config_utils"].normalize_layout_recognizer.return_value = ("DeepDOC", "DeepDOC")
+
+# All global mocks are removed and will be handled by patch.dict in setUpClass.
 # ----------------- MOCK SETUP END -----------------
 
-# Imports moved to setUp to ensure mocks are in place
+# Imports moved to setUpClass to ensure mocks are in place
 # from rag.templates.presentation import Pdf, Ppt, chunk
 
 
 class TestPresentationTemplate(unittest.TestCase):
     """Tests for the presentation template to verify callback safety and argument handling."""
 
-    def setUp(self):
-        self.mock_modules = {
-            "rag.app.format_parsers": MagicMock(),
-            "rag.orchestration.router": MagicMock(PARSERS={}),
-            "rag.templates.general": MagicMock(),
-            "rag.templates.semantic": MagicMock(),
-            "rag.nlp": MagicMock(),
-            "rag.utils.file_utils": MagicMock(),
-            "common": MagicMock(),
-            "common.settings": MagicMock(),
-            "common.parser_config_utils": MagicMock(),
-            "api.db.services.llm_service": MagicMock(),
-            "rag.parsers": MagicMock(),
-            "rag.parsers.deepdoc": MagicMock(),
-            "rag.parsers.deepdoc.ppt_parser": MagicMock(),
-            "pptx": MagicMock(),
-            "deepdoc": MagicMock(),
-            "deepdoc.vision": MagicMock(),
-        }
-        self.patcher = patch.dict(sys.modules, self.mock_modules)
-        self.patcher.start()
-        self.addCleanup(self.patcher.stop)
-
-        # Configure common.parser_config_utils.normalize_layout_recognizer to return a valid tuple
-        self.mock_modules["common.parser_config_utils"].normalize_layout_recognizer.return_value = ("DeepDOC", "DeepDOC")
+    @classmethod
+    def setUpClass(cls):
+        cls._saved_modules = _install_presentation_mocks()
+        cls.modules_patcher = patch.dict(sys.modules, _SHARED_MOCK_MODULES)
+        cls.modules_patcher.start()
 
         from rag.templates.presentation import Pdf, Ppt, chunk
 
-        self.Pdf = Pdf
-        self.Ppt = Ppt
-        self.chunk = chunk
+        cls.Pdf = Pdf
+        cls.Ppt = Ppt
+        cls.chunk = staticmethod(chunk)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.modules_patcher.stop()
+        _restore_presentation_mocks(*cls._saved_modules)
+        _reset_mock_presentation()
+
+    def setUp(self):
         patcher = patch("rag.templates.presentation.BytesIO")
         patcher.start()
         self.addCleanup(patcher.stop)
 
     def test_pdf_callback_none_safe(self):
         """Test Pdf parser with callback=None does NOT raise TypeError."""
-        # Manually set the settings value on the mocked module
-        sys.modules["common"].settings.PARALLEL_DEVICES = 0
         parser = self.Pdf()
         parser._images = MagicMock()
         parser._layouts_rec = MagicMock()
@@ -182,11 +249,14 @@ class TestPresentationTemplate(unittest.TestCase):
         parser._extract_table_figure = MagicMock(return_value=[])
 
         try:
-            # Manually set the settings value on the imported module to avoid mock issues
+            # Pin PARALLEL_DEVICES for this test only so it does not leak into the shared stubs
             import rag.parsers.deepdoc.pdf_parser
 
-            rag.parsers.deepdoc.pdf_parser.settings.PARALLEL_DEVICES = 0
-            parser("dummy.pdf", callback=None)
+            with (
+                patch.object(sys.modules["common"].settings, "PARALLEL_DEVICES", 0),
+                patch.object(rag.parsers.deepdoc.pdf_parser.settings, "PARALLEL_DEVICES", 0),
+            ):
+                parser("dummy.pdf", callback=None)
         except TypeError as e:
             self.fail(f"Pdf raised TypeError with callback=None: {e}")
         except Exception:
@@ -251,32 +321,5 @@ class TestPresentationTemplate(unittest.TestCase):
             self.assertEqual(args[2], 123, f"Expected to_page=123, got {args[2]}")
 
 
-def teardown_module():
-    """Restore sys.modules to original state after tests complete."""
-    # Remove the imported presentation module to allow fresh imports in other tests
-    if "rag.templates.presentation" in sys.modules:
-        del sys.modules["rag.templates.presentation"]
-
-    # Restore original sys.modules entries
-    for mod, original_value in _original_modules.items():
-        if original_value is None:
-            # Module didn't exist originally, remove it
-            sys.modules.pop(mod, None)
-        else:
-            # Restore original module
-            sys.modules[mod] = original_value
-
-    # Restore intermediate package names to ensure complete isolation
-    # Process in reverse order (deepest to shallowest) to avoid parent/child issues
-    for pkg in reversed(_INTERMEDIATE_PACKAGES):
-        original_value = _original_intermediate_packages.get(pkg)
-        if original_value is None:
-            # Package didn't exist originally, remove it
-            sys.modules.pop(pkg, None)
-        else:
-            # Restore original package
-            sys.modules[pkg] = original_value
-
-
 if __name__ == "__main__":
     unittest.main()
@@ -5,37 +5,84 @@ Excel, TXT, CSV, and edge cases.
 """
 
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import Mock, patch
+
+from test.mocks.mock_utils import scoped_mocks
+
+# Prefixes that rmPrefix should strip, as (input, expected) pairs
+_RMPREFIX_CASES = (
+    ("Q: What is this?", "What is this?"),
+    ("Question: What is this?", "What is this?"),
+    ("问题：这是什么？", "这是什么？"),
+    ("A: This is the answer", "This is the answer"),
+    ("Answer: This is the answer", "This is the answer"),
+    ("回答：这是答案", "这是答案"),
+    ("user: Hello", "Hello"),
+    ("assistant: Hi there", "Hi there"),
+    ("问：简单问题", "简单问题"),
+    ("答：简单答案", "简单答案"),
+)
+
+# get_text and the parsers are mocked in these tests, so chunk() never reads the binary
+_EMPTY = b""
+
+# TXT inputs as (filename, text, expected chunk count, text the first chunk must contain)
+_TXT_CASES = (
+    # Tab delimiter is detected and both pairs parsed
+    ("test.txt", "Q1\tA1\nQ2\tA2", 2, None),
+    # Empty input yields no chunks
+    ("empty.txt", "", 0, None),
+    # Lines without exactly two columns are skipped
+    ("malformed.txt", "only_one_column\n", 0, None),
+    ("no_delimiter.txt", "No delimiter here\nAnother line without delimiter", 0, None),
+    # Invalid lines between valid ones are skipped
+    ("mixed.txt", "Q1,A1\nInvalid line\nQ2,A2", 2, None),
+    # A line without a delimiter continues the previous answer
+    ("multiline.txt", "Question1,Answer line 1\nContinuation of answer", 1, "Continuation"),
+)
+
+# A single well-formed Q&A line
+_PYTHON_QA_TEXT = "What is Python?,A programming language"
+
+# Markdown headings and the (level, text) mdQuestionLevel should return for them
+_HEADING_CASES = (
+    ("# Heading 1", (1, "Heading 1")),
+    ("## Heading 2", (2, "Heading 2")),
+    ("### Heading 3", (3, "Heading 3")),
+    ("#### Heading 4", (4, "Heading 4")),
+    ("##### Heading 5", (5, "Heading 5")),
+    ("###### Heading 6", (6, "Heading 6")),
+)
+
+
+# One stub install shared by both test classes; entered in setUpModule
+_module_mocks = scoped_mocks(purge=("rag.templates.q_and_a",))
+
+
+def setUpModule():
+    _module_mocks.__enter__()
+
+
+def tearDownModule():
+    _module_mocks.__exit__(None, None, None)
 
 
 class BaseQAndATestCase(unittest.TestCase):
-    """Base test case with shared mock setup."""
+    """Base test case exposing the q_and_a module imported under the module-wide mocks."""
 
-    def setUp(self):
-        from test.mocks.mock_utils import setup_mocks
-
-        self.original_modules = setup_mocks()
-
-    def tearDown(self):
-        from test.mocks.mock_utils import teardown_mocks
+    @classmethod
+    def setUpClass(cls):
+        # Import q_and_a after mocks are set up; later classes reuse the cached module
+        from rag.templates import q_and_a
 
-        teardown_mocks(self.original_modules)
+        cls.q_and_a = q_and_a
 
 
 class TestQAndATemplate(BaseQAndATestCase):
     """Tests for the Q&A template."""
 
     def setUp(self):
-        super().setUp()
-        # Import q_and_a after mocks are set up
-        from rag.templates import q_and_a
-
-        self.q_and_a = q_and_a
-
-        self.callback = MagicMock()
-
-    def tearDown(self):
-        super().tearDown()
+        self.callback = Mock(spec=lambda *args, **kwargs: None)
 
     def test_chunk_excel(self):
         """Test Excel file parsing returns expected Q&A pairs."""
@@ -45,7 +92,7 @@ class TestQAndATemplate(BaseQAndATestCase):
             # Note: rmPrefix strips "A " prefix (matches "A:" pattern) so use answer without A prefix
             mock_instance.return_value = ([("What is this?", "This is a test answer.")], "eng")
 
-            res = self.q_and_a.chunk("test.xlsx", b"content", callback=self.callback)
+            res = self.q_and_a.chunk("test.xlsx", _EMPTY, callback=self.callback)
 
             # Verify that the result contains the expected Q&A chunk data
             self.assertEqual(len(res), 1)
@@ -60,15 +107,12 @@ class TestQAndATemplate(BaseQAndATestCase):
     def test_chunk_txt(self):
         """Test TXT file parsing with comma-delimited Q&A pairs."""
         filename = "test.txt"
-        binary = b"Question,Answer"
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = "Question,Answer"
 
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
+        with patch.object(self.q_and_a, "get_text", return_value="Question,Answer") as mock_get:
+            res = self.q_and_a.chunk(filename, _EMPTY, callback=self.callback)
 
             # Verify mock was called with the expected arguments
-            mock_get.assert_called_once_with(filename, binary)
+            mock_get.assert_called_once_with(filename, _EMPTY)
 
             # Verify result structure
             self.assertEqual(len(res), 1)
@@ -79,85 +123,24 @@ class TestQAndATemplate(BaseQAndATestCase):
             # Should have question prefix
             self.assertRegex(res[0]["content_with_weight"], r"(问题：|Question:)")
 
-    def test_chunk_txt_tab_delimited(self):
-        """Test TXT file parsing with tab-delimited Q&A pairs."""
-        filename = "test.txt"
-        binary = b"Q1\tA1\nQ2\tA2"
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = "Q1\tA1\nQ2\tA2"
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
-
-            mock_get.assert_called_once_with(filename, binary)
-            # Should detect tab delimiter and parse both Q&A pairs
-            self.assertEqual(len(res), 2)
-
-    def test_empty_input_txt(self):
-        """Test handling of empty TXT input."""
-        filename = "empty.txt"
-        binary = b""
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = ""
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
-
-            # Empty input should return empty result
-            self.assertEqual(len(res), 0)
-
-    def test_malformed_q_and_a_txt(self):
-        """Test handling of malformed Q&A format (not exactly 2 columns)."""
-        filename = "malformed.txt"
-        binary = b"only_one_column\n"
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = "only_one_column\n"
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
-
-            # Malformed lines should be skipped
-            self.assertEqual(len(res), 0)
-
-    def test_missing_delimiters_txt(self):
-        """Test handling of lines without proper delimiters."""
-        filename = "no_delimiter.txt"
-        binary = b"No delimiter here\nAnother line without delimiter"
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = "No delimiter here\nAnother line without delimiter"
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
-
-            # Lines without exactly 2 fields should be skipped
-            self.assertEqual(len(res), 0)
-
-    def test_mixed_valid_invalid_lines_txt(self):
-        """Test handling of mix of valid and invalid lines."""
-        filename = "mixed.txt"
-        # Line 1: valid, Line 2: invalid (no delimiter), Line 3: valid
-        text = "Q1,A1\nInvalid line\nQ2,A2"
-        binary = text.encode()
-
+    def test_chunk_txt_variants(self):
+        """Test TXT parsing across delimiters, empty input and malformed lines."""
         with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = text
+            for filename, text, expected_len, expected_text in _TXT_CASES:
+                with self.subTest(filename=filename):
+                    mock_get.return_value = text
 
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
+                    res = self.q_and_a.chunk(filename, _EMPTY, callback=self.callback)
 
-            # Should parse 2 valid Q&A pairs
-            self.assertEqual(len(res), 2)
+                    mock_get.assert_called_with(filename, _EMPTY)
+                    self.assertEqual(len(res), expected_len)
+                    if expected_text:
+                        self.assertIn(expected_text, res[0]["content_with_weight"])
 
     def test_chunk_content_validation_txt(self):
         """Test that chunk content is properly structured."""
-        filename = "test.txt"
-        question = "What is Python?"
-        answer = "A programming language"
-        binary = f"{question},{answer}".encode()
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = f"{question},{answer}"
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
+        with patch.object(self.q_and_a, "get_text", return_value=_PYTHON_QA_TEXT):
+            res = self.q_and_a.chunk("test.txt", _EMPTY, callback=self.callback)
 
             self.assertEqual(len(res), 1)
             chunk = res[0]
@@ -175,47 +158,15 @@ class TestQAndATemplate(BaseQAndATestCase):
     def test_unsupported_file_format(self):
         """Test that unsupported file format raises NotImplementedError."""
         with self.assertRaises(NotImplementedError) as context:
-            self.q_and_a.chunk("test.unsupported", b"content", callback=self.callback)
+            self.q_and_a.chunk("test.unsupported", _EMPTY, callback=self.callback)
 
         self.assertIn("supported", str(context.exception).lower())
 
-    def test_multiline_answer_txt(self):
-        """Test handling of answers that span multiple lines."""
-        filename = "multiline.txt"
-        # First line starts Q&A, subsequent lines continue the answer
-        text = "Question1,Answer line 1\nContinuation of answer"
-        binary = text.encode()
-
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = text
-
-            res = self.q_and_a.chunk(filename, binary, callback=self.callback)
-
-            # The continuation should be appended to the answer
-            self.assertEqual(len(res), 1)
-            # The answer should contain the continuation
-            self.assertIn("Continuation", res[0]["content_with_weight"])
-
     def test_rmprefix_function(self):
         """Test the rmPrefix helper function."""
-        # Test various prefixes that should be stripped
-        test_cases = [
-            ("Q: What is this?", "What is this?"),
-            ("Question: What is this?", "What is this?"),
-            ("问题：这是什么？", "这是什么？"),
-            ("A: This is the answer", "This is the answer"),
-            ("Answer: This is the answer", "This is the answer"),
-            ("回答：这是答案", "这是答案"),
-            ("user: Hello", "Hello"),
-            ("assistant: Hi there", "Hi there"),
-            ("问：简单问题", "简单问题"),
-            ("答：简单答案", "简单答案"),
-        ]
-
-        for input_text, expected in test_cases:
+        for input_text, expected in _RMPREFIX_CASES:
             with self.subTest(input=input_text):
-                result = self.q_and_a.rmPrefix(input_text)
-                self.assertEqual(result, expected)
+                self.assertEqual(self.q_and_a.rmPrefix(input_text), expected)
 
     def test_rmprefix_no_prefix(self):
         """Test rmPrefix with text that has no matching prefix."""
@@ -225,18 +176,15 @@ class TestQAndATemplate(BaseQAndATestCase):
 
     def test_english_language_flag(self):
         """Test that English language flag affects output formatting."""
-        with patch.object(self.q_and_a, "get_text") as mock_get:
-            mock_get.return_value = "Question,Answer"
-
+        with patch.object(self.q_and_a, "get_text", return_value="Question,Answer"):
             # Test with English
-            res_en = self.q_and_a.chunk("test.txt", b"data", lang="English", callback=self.callback)
+            res_en = self.q_and_a.chunk("test.txt", _EMPTY, lang="English", callback=self.callback)
             self.assertEqual(len(res_en), 1)
             # English should use "Question:" and "Answer:" prefixes
             self.assertIn("Question:", res_en[0]["content_with_weight"])
 
             # Test with Chinese (default)
-            mock_get.return_value = "Question,Answer"
-            res_zh = self.q_and_a.chunk("test.txt", b"data", lang="Chinese", callback=self.callback)
+            res_zh = self.q_and_a.chunk("test.txt", _EMPTY, lang="Chinese", callback=self.callback)
             self.assertEqual(len(res_zh), 1)
             # Chinese should use "问题：" and "回答：" prefixes
             self.assertIn("问题：", res_zh[0]["content_with_weight"])
@@ -245,27 +193,9 @@ class TestQAndATemplate(BaseQAndATestCase):
 class TestMdQuestionLevel(BaseQAndATestCase):
     """Test cases for the mdQuestionLevel helper function."""
 
-    def setUp(self):
-        super().setUp()
-        from rag.templates import q_and_a
-
-        self.q_and_a = q_and_a
-
-    def tearDown(self):
-        super().tearDown()
-
     def test_heading_levels(self):
         """Test that markdown heading levels are correctly detected."""
-        test_cases = [
-            ("# Heading 1", (1, "Heading 1")),
-            ("## Heading 2", (2, "Heading 2")),
-            ("### Heading 3", (3, "Heading 3")),
-            ("#### Heading 4", (4, "Heading 4")),
-            ("##### Heading 5", (5, "Heading 5")),
-            ("###### Heading 6", (6, "Heading 6")),
-        ]
-
-        for input_text, expected in test_cases:
+        for input_text, expected in _HEADING_CASES:
             with self.subTest(input=input_text):
                 result = self.q_and_a.mdQuestionLevel(input_text)
                 self.assertEqual(result, expected)
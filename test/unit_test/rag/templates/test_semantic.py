@@ -21,31 +21,29 @@ Reference: LlamaIndex MarkdownNodeParser
 https://github.com/run-llama/llama_index/blob/main/llama-index-core/llama_index/core/node_parser/file/markdown.py
 """
 
+import asyncio
+import sys
 import unittest
 from unittest.mock import patch
 
 from rag.orchestration.base import StandardizedDocument
+from test.mocks.mock_utils import scoped_mocks
 
 
 class SemanticTestBase(unittest.TestCase):
-    """Base class for Semantic template tests handling module reloading."""
+    """Base class for Semantic template tests; mocks and the module are set up once per class."""
 
-    def setUp(self):
-        from test.mocks.mock_utils import setup_mocks
+    @classmethod
+    def setUpClass(cls):
+        cls.enterClassContext(scoped_mocks(purge=("rag.templates.semantic",)))
 
-        setup_mocks()
-
-        import sys
-
-        # Reload the module to ensure a fresh import for this test class when mocks may persist between tests.
-        if "rag.templates.semantic" in sys.modules:
-            del sys.modules["rag.templates.semantic"]
+        # Drop any copy imported against other mocks so this class gets a fresh import
+        sys.modules.pop("rag.templates.semantic", None)
 
         import rag.templates.semantic
 
-        # Bind fresh classes to self for use in tests
-        self.SemanticChunk = rag.templates.semantic.SemanticChunk
-        self.Semantic = rag.templates.semantic.Semantic
+        cls.SemanticChunk = rag.templates.semantic.SemanticChunk
+        cls.Semantic = rag.templates.semantic.Semantic
 
 
 class TestSemanticChunkDataclass(SemanticTestBase):
@@ -53,9 +51,9 @@ class TestSemanticChunkDataclass(SemanticTestBase):
 
     def test_create_chunk(self):
         """Test creating a semantic chunk."""
-        chunk = self.SemanticChunk(text="Some text content", header_path=["Introduction", "Background"], metadata={"tokens": 10})
+        chunk = self.SemanticChunk(text="Some text content", header_path=("Introduction", "Background"), metadata={"tokens": 10})
         self.assertEqual(chunk.text, "Some text content")
-        self.assertEqual(chunk.header_path, ["Introduction", "Background"])
+        self.assertEqual(chunk.header_path, ("Introduction", "Background"))
         self.assertEqual(chunk.metadata["tokens"], 10)
 
 
@@ -71,7 +69,7 @@ This is the introduction text.
         chunks = self.Semantic._parse_with_headers(content, chunk_token_num=500, overlap_percent=0)
 
         self.assertEqual(len(chunks), 1)
-        self.assertEqual(chunks[0].header_path, ["Introduction"])
+        self.assertEqual(chunks[0].header_path, ("Introduction",))
         self.assertIn("# Introduction", chunks[0].text)
         self.assertIn("introduction text", chunks[0].text)
 
@@ -96,9 +94,9 @@ Detail text.
 
         # Verify header paths build correctly
         paths = [c.header_path for c in chunks]
-        self.assertIn(["Chapter 1"], paths)
-        self.assertIn(["Chapter 1", "Section 1.1"], paths)
-        self.assertIn(["Chapter 1", "Section 1.1", "Subsection 1.1.1"], paths)
+        self.assertIn(("Chapter 1",), paths)
+        self.assertIn(("Chapter 1", "Section 1.1"), paths)
+        self.assertIn(("Chapter 1", "Section 1.1", "Subsection 1.1.1"), paths)
 
     def test_sibling_headers(self):
         """Test parsing content with sibling headers (H2 followed by H2)."""
@@ -117,11 +115,11 @@ B content.
         paths = [c.header_path for c in chunks]
 
         # Section A and Section B should both be under Main
-        self.assertIn(["Main", "Section A"], paths)
-        self.assertIn(["Main", "Section B"], paths)
+        self.assertIn(("Main", "Section A"), paths)
+        self.assertIn(("Main", "Section B"), paths)
 
         # Section B should NOT be under Section A
-        self.assertNotIn(["Main", "Section A", "Section B"], paths)
+        self.assertNotIn(("Main", "Section A", "Section B"), paths)
 
     def test_going_up_hierarchy(self):
         """Test that going from H3 to H2 correctly pops the stack."""
@@ -142,11 +140,11 @@ Section 2 content.
         paths = [c.header_path for c in chunks]
 
         # Detail 1 should be under Section 1
-        self.assertIn(["Main", "Section 1", "Detail 1"], paths)
+        self.assertIn(("Main", "Section 1", "Detail 1"), paths)
 
         # Section 2 should be under Main, NOT under Detail 1
-        self.assertIn(["Main", "Section 2"], paths)
-        self.assertNotIn(["Main", "Section 1", "Detail 1", "Section 2"], paths)
+        self.assertIn(("Main", "Section 2"), paths)
+        self.assertNotIn(("Main", "Section 1", "Detail 1", "Section 2"), paths)
 
     def test_code_block_protection(self):
         """Test that headers inside code blocks are NOT parsed."""
@@ -164,7 +162,7 @@ More text after code block.
 
         # Should only have one chunk with one header
         self.assertEqual(len(chunks), 1)
-        self.assertEqual(chunks[0].header_path, ["Real Header"])
+        self.assertEqual(chunks[0].header_path, ("Real Header",))
 
         # The "# This is a comment" should be in the text, not treated as header
         self.assertIn("# This is a comment", chunks[0].text)
@@ -191,7 +189,26 @@ End text.
 
         # Should be one chunk with all content under "Header"
         self.assertEqual(len(chunks), 1)
-        self.assertEqual(chunks[0].header_path, ["Header"])
+        self.assertEqual(chunks[0].header_path, ("Header",))
+
+    def test_longer_fence_not_closed_by_shorter(self):
+        """Test that a shorter fence inside a longer one does not close it."""
+        content = """# Header
+
+````markdown
+```
+# Not a header
+```
+## Still not a header
+````
+
+End text.
+"""
+        chunks = self.Semantic._parse_with_headers(content, chunk_token_num=500, overlap_percent=0)
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].header_path, ("Header",))
+        self.assertIn("## Still not a header", chunks[0].text)
 
     def test_empty_content(self):
         """Test parsing empty content."""
@@ -210,7 +227,7 @@ Another paragraph.
 
         # Should have one chunk with root path (empty list)
         self.assertEqual(len(chunks), 1)
-        self.assertEqual(chunks[0].header_path, [])
+        self.assertEqual(chunks[0].header_path, ())
 
     def test_chunk_splitting(self):
         """Test that large content is split into multiple chunks."""
@@ -228,7 +245,41 @@ Another paragraph.
         # Should have multiple chunks, all with same header path
         self.assertGreater(len(chunks), 1)
         for chunk in chunks:
-            self.assertEqual(chunk.header_path, ["Header"])
+            self.assertEqual(chunk.header_path, ("Header",))
+
+    def test_repeated_parse_returns_independent_copies(self):
+        """Test that a cached parse is reused without sharing chunk objects."""
+        content = "# Header\n\nSome content.\n"
+
+        first = self.Semantic._parse_with_headers(content, chunk_token_num=500, overlap_percent=0)
+        first[0].metadata["tokens"] = -1
+
+        with patch.object(self.Semantic, "_split_with_headers") as mock_split:
+            second = self.Semantic._parse_with_headers(content, chunk_token_num=500, overlap_percent=0)
+
+        mock_split.assert_not_called()
+        self.assertEqual(second[0].header_path, ("Header",))
+        self.assertNotEqual(second[0].metadata["tokens"], -1)
+        self.assertIsNot(first[0], second[0])
+
+    def test_parse_cache_bounded_by_text_size(self):
+        """Test that cached parses are evicted once their total chunk text exceeds the limit."""
+        module = sys.modules[self.Semantic.__module__]
+        first = "# First\n\nSome content.\n"
+        second = "# Second\n\nMore content.\n"
+
+        module._clear_parse_cache()
+        self.addCleanup(module._clear_parse_cache)
+        with patch.object(module, "_PARSE_CACHE_MAX_CHARS", 30):
+            self.Semantic._parse_with_headers(first, chunk_token_num=500, overlap_percent=0)
+            self.Semantic._parse_with_headers(second, chunk_token_num=500, overlap_percent=0)
+
+            # Only the most recent parse fits under the limit
+            self.assertEqual(len(module._PARSE_CACHE), 1)
+            self.assertLessEqual(module._parse_cache_chars, 30)
+            with patch.object(self.Semantic, "_split_with_headers", return_value=[]) as mock_split:
+                self.Semantic._parse_with_headers(first, chunk_token_num=500, overlap_percent=0)
+            mock_split.assert_called_once()
 
 
 class TestSemanticChunkMethod(SemanticTestBase):
@@ -285,6 +336,21 @@ Background content.
         self.assertIn(["Introduction"], paths)
         self.assertIn(["Introduction", "Background"], paths)
 
+    @patch("rag.templates.semantic.rag_tokenizer")
+    def test_chunk_async_matches_chunk(self, mock_tokenizer):
+        """Test that chunk_async() returns the same chunks, in order, as chunk()."""
+        mock_tokenizer.tokenize.side_effect = lambda text: text.upper()
+        mock_tokenizer.fine_grained_tokenize.side_effect = lambda tokens: tokens.lower()
+
+        doc = StandardizedDocument(content_input="# One\n\nFirst.\n\n# Two\n\nSecond.\n")
+        parser_config = {"chunk_token_num": 500}
+
+        sync_chunks = self.Semantic.chunk(filename="test.pdf", standardized_doc=doc, parser_config=parser_config, doc={}, is_english=True)
+        async_chunks = asyncio.run(self.Semantic.chunk_async(filename="test.pdf", standardized_doc=doc, parser_config=parser_config, doc={}, is_english=True))
+
+        self.assertEqual(async_chunks, sync_chunks)
+        self.assertEqual([c["header_path"] for c in async_chunks], [["One"], ["Two"]])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,67 +1,69 @@
-import unittest
-from unittest.mock import patch, MagicMock
 import sys
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def mocked_modules():
+    """Stub the parser, deepdoc and tokenizer packages once for every test in this module."""
+    modules = {
+        "rag.parsers": MagicMock(),
+        "rag.parsers.deepdoc_client": MagicMock(),
+        "rag.parsers.PdfParser": MagicMock(),
+        "rag.parsers.ExcelParser": MagicMock(),
+        "rag.parsers.HtmlParser": MagicMock(),
+        "deepdoc": MagicMock(),
+        "deepdoc.parser": MagicMock(),
+        "common": MagicMock(),
+        "common.token_utils": MagicMock(),
+        "bs4": MagicMock(),
+    }
+    patcher = patch.dict(sys.modules, modules)
+    patcher.start()
+    yield modules
+    patcher.stop()
+
+
+@pytest.fixture(scope="module")
+def single_chunk(mocked_modules):
+    """rag.templates.single_chunk imported once against the stubbed modules."""
+    from rag.templates import single_chunk
+
+    return single_chunk
+
+
+def test_chunk_txt(single_chunk):
+    # Test simple text chunking fallback
+    filename = "test.txt"
+    binary = b"Line 1\nLine 2\nLine 3"
+
+    # Mock get_text to return string directly
+    with patch.object(single_chunk, "get_text") as mock_get_text:
+        mock_get_text.return_value = "Line 1\nLine 2\nLine 3"
+
+        res = single_chunk.chunk(filename, binary, callback=lambda p, m: None)
+
+        # Should return 1 document
+        assert len(res) == 1
+        # The content tokenization is complex to check without exact tokenizer,
+        # but we verify structure.
+        assert "docnm_kwd" in res[0]
+        assert res[0]["docnm_kwd"] == filename
+
+
+def test_chunk_docx(single_chunk):
+    # Verify logic branches to Docx parser
+    mock_docx_instance = MagicMock()
+    # Configure mock to look like it parsed content
+    mock_docx_instance.return_value = [("Parsed Docx Content", [], [])]
+
+    with patch.object(single_chunk, "Docx") as mock_docx, patch.object(single_chunk, "vision_figure_parser_docx_wrapper_naive") as _:
+        mock_docx.return_value = mock_docx_instance
 
+        res = single_chunk.chunk("test.docx", b"binary", callback=lambda p, m: None)
 
-class TestSingleChunk(unittest.TestCase):
-    def setUp(self):
-        # Setup mocks
-        self.mock_modules = {
-            "rag.parsers": MagicMock(),
-            "rag.parsers.deepdoc_client": MagicMock(),
-            "rag.parsers.PdfParser": MagicMock(),
-            "rag.parsers.ExcelParser": MagicMock(),
-            "rag.parsers.HtmlParser": MagicMock(),
-            "deepdoc": MagicMock(),
-            "deepdoc.parser": MagicMock(),
-            "common": MagicMock(),
-            "common.token_utils": MagicMock(),
-            "bs4": MagicMock(),
-        }
-        self.patcher = patch.dict(sys.modules, self.mock_modules)
-        self.patcher.start()
-
-        from rag.templates import single_chunk
-
-        self.single_chunk = single_chunk
-
-    def tearDown(self):
-        self.patcher.stop()
-
-    def test_chunk_txt(self):
-        # Test simple text chunking fallback
-        filename = "test.txt"
-        binary = b"Line 1\nLine 2\nLine 3"
-
-        # Mock get_text to return string directly
-        with patch.object(self.single_chunk, "get_text") as mock_get_text:
-            mock_get_text.return_value = "Line 1\nLine 2\nLine 3"
-
-            res = self.single_chunk.chunk(filename, binary, callback=lambda p, m: None)
-
-            # Should return 1 document
-            self.assertEqual(len(res), 1)
-            # The content tokenization is complex to check without exact tokenizer,
-            # but we verify structure.
-            self.assertIn("docnm_kwd", res[0])
-            self.assertEqual(res[0]["docnm_kwd"], filename)
-
-    def test_chunk_docx(self):
-        # Verify logic branches to Docx parser
-        mock_docx_instance = MagicMock()
-        # Configure mock to look like it parsed content
-        mock_docx_instance.return_value = [("Parsed Docx Content", [], [])]
-
-        with patch.object(self.single_chunk, "Docx") as mock_docx, patch.object(self.single_chunk, "vision_figure_parser_docx_wrapper_naive") as _:
-            mock_docx.return_value = mock_docx_instance
-
-            res = self.single_chunk.chunk("test.docx", b"binary", callback=lambda p, m: None)
-
-            mock_docx.assert_called_once()
-            self.assertEqual(len(res), 1)
-            # Verify the content was used
-            self.assertIn("Parsed Docx Content", res[0]["content_with_weight"])
-
-
-if __name__ == "__main__":
-    unittest.main()
+        mock_docx.assert_called_once()
+        assert len(res) == 1
+        # Verify the content was used
+        assert "Parsed Docx Content" in res[0]["content_with_weight"]
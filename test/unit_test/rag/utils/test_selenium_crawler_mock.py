@@ -1,174 +1,237 @@
-import unittest
-import sys
 import os
+import sys
 
 import importlib
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
 
-class TestSeleniumCrawler(unittest.TestCase):
-    def setUp(self):
-        # Create mocks for dependencies
-        self.mock_selenium = MagicMock()
-        self.mock_selenium.common.exceptions.TimeoutException = TimeoutError
-
-        self.mock_seleniumwire = MagicMock()
-        self.mock_deepdoc = MagicMock()
-        self.mock_api = MagicMock()
-
-        # Setup the patcher for sys.modules
-        self.modules_patcher = patch.dict(
-            sys.modules,
-            {
-                "selenium": self.mock_selenium,
-                "selenium.common": self.mock_selenium.common,
-                "selenium.common.exceptions": self.mock_selenium.common.exceptions,
-                "seleniumwire": self.mock_seleniumwire,
-                "seleniumwire.webdriver": self.mock_seleniumwire.webdriver,
-                "deepdoc": self.mock_deepdoc,
-                "deepdoc.parser": self.mock_deepdoc.parser,
-                "deepdoc.parser.html_parser": self.mock_deepdoc.parser.html_parser,
-                "api": self.mock_api,
-                "api.db": self.mock_api.db,
-                "api.db.services": self.mock_api.db.services,
-                "api.db.services.file_service": self.mock_api.db.services.file_service,
-            },
-        )
-        self.modules_patcher.start()
 
-        # Import (and reload) the module under test to apply mocks
-        import rag.utils.selenium_crawler
+class _FakeScandir(list):
+    """os.scandir() stand-in: a context manager over regular-file DirEntry look-alikes of size 100."""
+
+    def __init__(self, *names):
+        super().__init__(
+            SimpleNamespace(
+                name=name,
+                path=os.path.join("/downloads", name),
+                is_file=lambda: True,
+                stat=lambda: SimpleNamespace(st_size=100),
+            )
+            for name in names
+        )
 
-        self.crawler_module = importlib.reload(rag.utils.selenium_crawler)
-        self.SeleniumCrawler = self.crawler_module.SeleniumCrawler
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture(scope="module")
+def mocked_modules():
+    """Stub selenium, seleniumwire, deepdoc and api once for every test in this module."""
+    mock_selenium = MagicMock()
+    mock_selenium.common.exceptions.TimeoutException = TimeoutError
+    mock_seleniumwire = MagicMock()
+    mock_deepdoc = MagicMock()
+    mock_api = MagicMock()
+
+    modules = {
+        "selenium": mock_selenium,
+        "selenium.common": mock_selenium.common,
+        "selenium.common.exceptions": mock_selenium.common.exceptions,
+        "seleniumwire": mock_seleniumwire,
+        "seleniumwire.webdriver": mock_seleniumwire.webdriver,
+        "deepdoc": mock_deepdoc,
+        "deepdoc.parser": mock_deepdoc.parser,
+        "deepdoc.parser.html_parser": mock_deepdoc.parser.html_parser,
+        "api": mock_api,
+        "api.db": mock_api.db,
+        "api.db.services": mock_api.db.services,
+        "api.db.services.file_service": mock_api.db.services.file_service,
+    }
+    patcher = patch.dict(sys.modules, modules)
+    patcher.start()
+    yield modules
+    patcher.stop()
+
+
+@pytest.fixture(scope="module")
+def crawler_module(mocked_modules):
+    """rag.utils.selenium_crawler reloaded once against the stubbed modules."""
+    import rag.utils.selenium_crawler
+
+    return importlib.reload(rag.utils.selenium_crawler)
+
+
+@pytest.fixture
+def crawler(mocked_modules, crawler_module):
+    """The crawler and the stubbed collaborators the tests verify, with call history cleared."""
+    ctx = SimpleNamespace(
+        module=crawler_module,
+        SeleniumCrawler=crawler_module.SeleniumCrawler,
+        MockChrome=mocked_modules["seleniumwire.webdriver"].Chrome,
+        MockOptions=mocked_modules["seleniumwire.webdriver"].ChromeOptions,
+        MockFileService=mocked_modules["api.db.services.file_service"].FileService,
+        MockHtmlParser=mocked_modules["deepdoc.parser.html_parser"].RAGFlowHtmlParser,
+    )
+    # The mock tree is shared by the module; only clear call history between tests
+    for mock in (ctx.MockChrome, ctx.MockOptions, ctx.MockFileService, ctx.MockHtmlParser):
+        mock.reset_mock()
+    return ctx
+
+
+def test_parse_url_html(crawler):
+    # Setup mock driver and response
+    mock_driver = crawler.MockChrome.return_value
+    mock_request = MagicMock()
+    mock_request.response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    mock_driver.requests = [mock_request]
+    mock_driver.page_source = "<html><body><p>Hello World</p></body></html>"
+
+    # Mock HtmlParser result
+    crawler.MockHtmlParser.return_value.parser_txt.return_value = ["Hello World"]
+
+    result = crawler.SeleniumCrawler.parse_url("http://example.com", "/tmp/downloads", "user1")
+
+    assert result == "Hello World"
+    mock_driver.quit.assert_called_once()
+    mock_driver.set_page_load_timeout.assert_called_with(120)
+
+
+def test_parse_url_file_content_disposition(crawler):
+    # Setup mock driver and response
+    mock_driver = crawler.MockChrome.return_value
+    mock_request = MagicMock()
+    mock_request.response.headers = {"Content-Type": "application/pdf", "Content-Disposition": 'attachment; filename="test.pdf"'}
+    mock_driver.requests = [mock_request]
+
+    # Determine where _LocalFile is in the reloaded module
+    # Since we use patched sys.modules, imports inside selenium_crawler are using mocks.
+    # But _LocalFile is defined in selenium_crawler.py, so we should patch it on the module instance.
+
+    with (
+        patch.object(crawler.module, "_LocalFile") as MockLocalFile,
+        patch.object(crawler.module, "FileService") as MockFileService,
+        patch.object(crawler.SeleniumCrawler, "wait_for_download") as MockWait,
+    ):
+        MockWait.return_value = "test.pdf"
+        MockFileService.parse_docs.return_value = ["parsed_doc"]
+
+        result = crawler.SeleniumCrawler.parse_url("http://example.com/file.pdf", "/tmp/downloads", "user1")
+
+        # Verify wait_for_download called to verify existence
+        MockWait.assert_called_with("/tmp/downloads", expected_filename="test.pdf")
+
+        # Verify LocalFile created
+        MockLocalFile.assert_called_with("test.pdf", os.path.join("/tmp/downloads", "test.pdf"))
+
+        # Verify validation
+        assert result == ["parsed_doc"]
+        MockFileService.parse_docs.assert_called_once()
 
-        # Shortcuts for verification
-        self.MockChrome = self.mock_seleniumwire.webdriver.Chrome
-        self.MockOptions = self.mock_seleniumwire.webdriver.ChromeOptions
-        self.MockFileService = self.mock_api.db.services.file_service.FileService
-        self.MockHtmlParser = self.mock_deepdoc.parser.html_parser.RAGFlowHtmlParser
+        mock_driver.quit.assert_called_once()
 
-    def tearDown(self):
-        self.modules_patcher.stop()
 
-    def test_parse_url_html(self):
-        # Setup mock driver and response
-        mock_driver = self.MockChrome.return_value
-        mock_request = MagicMock()
-        mock_request.response.headers = {"Content-Type": "text/html; charset=utf-8"}
-        mock_driver.requests = [mock_request]
-        mock_driver.page_source = "<html><body><p>Hello World</p></body></html>"
+def test_parse_url_file_wait_download(crawler):
+    # Setup mock driver
+    mock_driver = crawler.MockChrome.return_value
+    mock_request = MagicMock()
+    mock_request.response.headers = {"Content-Type": "application/pdf"}
+    mock_driver.requests = [mock_request]
 
-        # Mock HtmlParser result
-        self.MockHtmlParser.return_value.parser_txt.return_value = ["Hello World"]
+    with (
+        patch.object(crawler.module, "_LocalFile") as MockLocalFile,
+        patch.object(crawler.SeleniumCrawler, "wait_for_download") as MockWait,
+        patch.object(crawler.module, "FileService") as MockFileService,
+    ):
+        MockWait.return_value = "downloaded_file.pdf"
+        MockFileService.parse_docs.return_value = ["parsed_doc"]
 
-        result = self.SeleniumCrawler.parse_url("http://example.com", "/tmp/downloads", "user1")
+        result = crawler.SeleniumCrawler.parse_url("http://example.com/file.pdf", "/tmp/downloads", "user1")
 
-        self.assertEqual(result, "Hello World")
+        MockWait.assert_called_with("/tmp/downloads")
+        MockLocalFile.assert_called_with("downloaded_file.pdf", os.path.join("/tmp/downloads", "downloaded_file.pdf"))
+        assert result == ["parsed_doc"]
         mock_driver.quit.assert_called_once()
-        mock_driver.set_page_load_timeout.assert_called_with(120)
-
-    def test_parse_url_file_content_disposition(self):
-        # Setup mock driver and response
-        mock_driver = self.MockChrome.return_value
-        mock_request = MagicMock()
-        mock_request.response.headers = {"Content-Type": "application/pdf", "Content-Disposition": 'attachment; filename="test.pdf"'}
-        mock_driver.requests = [mock_request]
-
-        # Determine where _LocalFile is in the reloaded module
-        # Since we use patched sys.modules, imports inside selenium_crawler are using mocks.
-        # But _LocalFile is defined in selenium_crawler.py, so we should patch it on the module instance.
-
-        with (
-            patch.object(self.crawler_module, "_LocalFile") as MockLocalFile,
-            patch.object(self.crawler_module, "FileService") as MockFileService,
-            patch.object(self.SeleniumCrawler, "wait_for_download") as MockWait,
-        ):
-            MockWait.return_value = "test.pdf"
-            MockFileService.parse_docs.return_value = ["parsed_doc"]
-
-            result = self.SeleniumCrawler.parse_url("http://example.com/file.pdf", "/tmp/downloads", "user1")
-
-            # Verify wait_for_download called to verify existence
-            MockWait.assert_called_with("/tmp/downloads", expected_filename="test.pdf")
-
-            # Verify LocalFile created
-            MockLocalFile.assert_called_with("test.pdf", os.path.join("/tmp/downloads", "test.pdf"))
-
-            # Verify validation
-            self.assertEqual(result, ["parsed_doc"])
-            MockFileService.parse_docs.assert_called_once()
-
-            mock_driver.quit.assert_called_once()
-
-    def test_parse_url_file_wait_download(self):
-        # Setup mock driver
-        mock_driver = self.MockChrome.return_value
-        mock_request = MagicMock()
-        mock_request.response.headers = {"Content-Type": "application/pdf"}
-        mock_driver.requests = [mock_request]
-
-        with (
-            patch.object(self.crawler_module, "_LocalFile") as MockLocalFile,
-            patch.object(self.SeleniumCrawler, "wait_for_download") as MockWait,
-            patch.object(self.crawler_module, "FileService") as MockFileService,
-        ):
-            MockWait.return_value = "downloaded_file.pdf"
-            MockFileService.parse_docs.return_value = ["parsed_doc"]
-
-            result = self.SeleniumCrawler.parse_url("http://example.com/file.pdf", "/tmp/downloads", "user1")
-
-            MockWait.assert_called_with("/tmp/downloads")
-            MockLocalFile.assert_called_with("downloaded_file.pdf", os.path.join("/tmp/downloads", "downloaded_file.pdf"))
-            self.assertEqual(result, ["parsed_doc"])
-            mock_driver.quit.assert_called_once()
-
-    @patch("os.listdir")
-    @patch("os.path.isfile")
-    @patch("os.path.getsize")
-    @patch("time.sleep")
-    @patch("time.time")
-    def test_wait_for_download(self, mock_time, mock_sleep, mock_getsize, mock_isfile, mock_listdir):
-        # Use a callable side_effect for time.time to be deterministic and robust
-        # Start at 0, increment by 1 on each call
-        self.time_counter = 0
-
-        def time_side_effect():
-            self.time_counter += 1
-            return self.time_counter
-
-        mock_time.side_effect = time_side_effect
-
-        # Scenario steps:
-        # 1. Start (time=1)
-        # 2. Check initial files.
-        # 3. Loop: time check (time=2 < start+10)
-        # 4. listdir -> finds nothing or crdownload
-        # 5. sleep
-        # 6. Loop: time check (time=3)
-        # 7. listdir -> finds target
-        # 8. isfile -> True
-        # 9. getsize -> 100
-        # 10. sleep
-        # 11. getsize -> 100 (stable)
-        # 12. return
-
-        mock_listdir.side_effect = [
-            ["file.crdownload"],  # Initial check
-            ["file.crdownload"],  # Loop 1
-            ["file.crdownload", "target.pdf"],  # Loop 2
-            ["file.crdownload", "target.pdf"],  # Loop 3 (if needed)
-        ]
-
-        mock_isfile.return_value = True
-        mock_getsize.side_effect = lambda x: 100  # Stable size regardless of calls
-
-        # We need to ensure we don't timeout. timeout=10.
-        # time values will be 1, 2, ...
-
-        result = self.SeleniumCrawler.wait_for_download("/downloads", timeout=10)
-        self.assertEqual(result, "target.pdf")
-
-
-if __name__ == "__main__":
-    unittest.main()
+
+
+@patch("os.listdir")
+@patch("os.scandir")
+@patch("os.path.getsize")
+@patch("time.sleep")
+@patch("time.time")
+def test_wait_for_download(mock_time, mock_sleep, mock_getsize, mock_scandir, mock_listdir, crawler, monkeypatch):
+    # Exercise the polling fallback used when inotify_simple is not installed
+    monkeypatch.setattr(crawler.module, "_INOTIFY_AVAILABLE", False)
+
+    # Use a callable side_effect for time.time to be deterministic and robust
+    # Start at 0, increment by 1 on each call
+    time_counter = 0
+
+    def time_side_effect():
+        nonlocal time_counter
+        time_counter += 1
+        return time_counter
+
+    mock_time.side_effect = time_side_effect
+
+    # Scenario steps:
+    # 1. Start (time=1)
+    # 2. Check initial files (listdir).
+    # 3. Loop: time check (time=2 < start+10)
+    # 4. scandir -> finds nothing or crdownload
+    # 5. sleep
+    # 6. Loop: time check (time=3)
+    # 7. scandir -> finds target, a regular file of size 100
+    # 8. sleep
+    # 9. getsize -> 100 (stable)
+    # 10. return
+
+    mock_listdir.return_value = ["file.crdownload"]  # Initial check
+    mock_scandir.side_effect = [
+        _FakeScandir("file.crdownload"),  # Loop 1
+        _FakeScandir("file.crdownload", "target.pdf"),  # Loop 2
+        _FakeScandir("file.crdownload", "target.pdf"),  # Loop 3 (if needed)
+    ]
+
+    mock_getsize.side_effect = lambda x: 100  # Stable size regardless of calls
+
+    # We need to ensure we don't timeout. timeout=10.
+    # time values will be 1, 2, ...
+
+    result = crawler.SeleniumCrawler.wait_for_download("/downloads", timeout=10)
+    assert result == "target.pdf"
+    mock_getsize.assert_called_with(os.path.join("/downloads", "target.pdf"))
+
+
+@patch("os.listdir")
+@patch("os.scandir")
+@patch("os.path.getsize")
+@patch("time.sleep")
+@patch("time.time")
+def test_wait_for_download_inotify(mock_time, mock_sleep, mock_getsize, mock_scandir, mock_listdir, crawler, monkeypatch):
+    mock_inotify = MagicMock()
+    monkeypatch.setattr(crawler.module, "_INOTIFY_AVAILABLE", True)
+    monkeypatch.setattr(crawler.module, "INotify", mock_inotify, raising=False)
+    monkeypatch.setattr(crawler.module, "inotify_flags", MagicMock(), raising=False)
+    watcher = mock_inotify.return_value
+
+    mock_time.side_effect = iter(range(1, 100))
+    mock_listdir.return_value = ["file.crdownload"]
+    mock_scandir.side_effect = [
+        _FakeScandir("file.crdownload"),  # Before the rename event
+        _FakeScandir("target.pdf"),  # After the watcher wakes up
+    ]
+    mock_getsize.return_value = 100
+
+    result = crawler.SeleniumCrawler.wait_for_download("/downloads", timeout=10)
+
+    assert result == "target.pdf"
+    watcher.add_watch.assert_called_once()
+    # One blocking read replaces the one-second poll; sleep only runs for the size check
+    watcher.read.assert_called_once()
+    mock_sleep.assert_called_once_with(1)
+    watcher.close.assert_called_once()
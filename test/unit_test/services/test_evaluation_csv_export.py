@@ -6,6 +6,7 @@ import csv
 import io
 import sys
 import os
+from types import SimpleNamespace
 
 # Add repo root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
@@ -14,13 +15,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 # This needs to be done before importing CommonService as well
 sys.modules["api.db.db_models"] = MagicMock()
 
-# Setup DB mock to support connection_context decorator
+# Setup DB mock to support connection_context as a decorator and a context manager
 mock_db = MagicMock()
 # When @DB.connection_context() is used, it calls __call__ on the return value of connection_context()
 # So we need DB.connection_context() -> returns decorator -> decorator(func) -> returns wrapped func
 def mock_decorator(func):
     return func
-mock_db.connection_context.return_value = mock_decorator
+# A MagicMock also supports `with DB.connection_context():`
+mock_db.connection_context.return_value = MagicMock(side_effect=mock_decorator)
 sys.modules["api.db.db_models"].DB = mock_db
 
 # Mock api.db.services.dialog_service to avoid import chain issues
@@ -31,13 +33,14 @@ sys.modules["api.db.services.dialog_service"] = MagicMock()
 # But sys.modules mock should handle it.
 
 from api.db.services.evaluation_service import EvaluationService
+from api.db.services.evaluation.report_service import EvaluationReportService, _cached_metric_keys
 from api.db.db_models import EvaluationDataset, EvaluationCase, EvaluationRun, EvaluationResult
 
 class TestEvaluationCSVExport(unittest.TestCase):
 
-    @patch("api.db.services.evaluation_service.EvaluationRun")
-    @patch("api.db.services.evaluation_service.EvaluationResult")
-    @patch("api.db.services.evaluation_service.EvaluationCase")
+    @patch("api.db.services.evaluation.report_service.EvaluationRun")
+    @patch("api.db.services.evaluation.report_service.EvaluationResult")
+    @patch("api.db.services.evaluation.report_service.EvaluationCase")
     def test_get_run_results_csv(self, MockEvaluationCase, MockEvaluationResult, MockEvaluationRun):
         # Setup run
         run_id = "run_123"
@@ -45,51 +48,44 @@ class TestEvaluationCSVExport(unittest.TestCase):
         MockEvaluationRun.get_by_id.return_value = mock_run
 
         # Setup results
-        # We need to mock the query chain: select -> join -> where -> order_by
+        # We need to mock the query chain: select -> join -> where -> order_by -> limit -> dicts
         mock_query = MagicMock()
         MockEvaluationResult.select.return_value = mock_query
         mock_query.join.return_value = mock_query
         mock_query.where.return_value = mock_query
         mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.dicts.return_value = mock_query
 
-        # Create mock result items
+        # Rows as returned by .dicts(): result and case columns side by side
         # Item 1
-        item1 = MagicMock()
-        item1.to_dict.return_value = {
-            "id": "res_1",
+        item1 = {
             "generated_answer": "Answer 1",
             "execution_time": 1.5,
             "retrieved_chunks": [{"chunk_id": "c1", "content_with_weight": "Content 1"}],
-            "metrics": {"precision": 1.0, "recall": 0.5}
-        }
-        item1.case_id.to_dict.return_value = {
-            "id": "case_1",
+            "metrics": {"precision": 1.0, "recall": 0.5},
             "question": "Question 1",
             "reference_answer": "Ref Answer 1",
-            "relevant_chunk_ids": ["c1", "c2"]
+            "relevant_chunk_ids": ["c1", "c2"],
         }
 
         # Item 2 (different metrics to test dynamic columns)
-        item2 = MagicMock()
-        item2.to_dict.return_value = {
-            "id": "res_2",
+        item2 = {
             "generated_answer": "Answer 2",
             "execution_time": 2.0,
             "retrieved_chunks": [],
-            "metrics": {"precision": 0.0, "f1_score": 0.0}
-        }
-        item2.case_id.to_dict.return_value = {
-            "id": "case_2",
+            "metrics": {"precision": 0.0, "f1_score": 0.0},
             "question": "Question 2",
             "reference_answer": "Ref Answer 2",
-            "relevant_chunk_ids": []
+            "relevant_chunk_ids": [],
         }
 
-        # Make query iterable
-        mock_query.__iter__.return_value = iter([item1, item2])
+        # Rows are streamed once through the server-side cursor
+        mock_query.iterator.return_value = iter([item1, item2])
 
-        # Execute
-        csv_output = EvaluationService.get_run_results_csv(run_id)
+        # Execute; metric columns come from a separate distinct-keys lookup
+        with patch.object(EvaluationReportService, "_metric_keys_for_run", return_value={"precision", "recall", "f1_score"}):
+            csv_output = EvaluationService.get_run_results_csv(run_id)
 
         # Verify
         self.assertIsNotNone(csv_output)
@@ -131,5 +127,109 @@ class TestEvaluationCSVExport(unittest.TestCase):
         rel_ids1 = json.loads(row1["Relevant Chunk IDs"])
         self.assertEqual(rel_ids1, ["c1", "c2"])
 
+    @patch("api.db.services.evaluation.report_service.EvaluationRun")
+    @patch("api.db.services.evaluation.report_service.EvaluationResult")
+    @patch("api.db.services.evaluation.report_service.EvaluationCase")
+    def test_get_run_results_csv_streaming(self, MockEvaluationCase, MockEvaluationResult, MockEvaluationRun):
+        MockEvaluationRun.get_by_id.return_value = MagicMock()
+
+        mock_query = MagicMock()
+        MockEvaluationResult.select.return_value = mock_query
+        mock_query.join.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.dicts.return_value = mock_query
+
+        items = [
+            {"id": f"r{i:04d}", "create_time": i, "generated_answer": "Answer", "execution_time": 1.0, "retrieved_chunks": [], "metrics": {"precision": 1.0}, "question": "Question", "reference_answer": "Ref", "relevant_chunk_ids": []}
+            for i in range(5000)
+        ]
+        # Keyset conditions compare the (mocked) columns with the last row seen
+        MockEvaluationResult.create_time.__gt__.return_value = MagicMock()
+        MockEvaluationResult.id.__gt__.return_value = MagicMock()
+        # One query per page; the page after the last full one comes back empty
+        pages = [items[i : i + 1000] for i in range(0, 5000, 1000)] + [[]]
+        mock_query.iterator.side_effect = [iter(page) for page in pages]
+
+        with patch.object(EvaluationReportService, "_metric_keys_for_run", return_value={"precision"}):
+            chunks = EvaluationService.iter_run_results_csv("run_123", chunk_rows=1000)
+        self.assertIsNotNone(chunks)
+
+        # Consume incrementally: bounded row chunks, the first one carrying the header
+        chunk_line_counts = [len(chunk.splitlines()) for chunk in chunks]
+        self.assertEqual(chunk_line_counts, [1001, 1000, 1000, 1000, 1000])
+
+        # Pages are bounded by a LIMIT rather than read from one open cursor
+        self.assertEqual(mock_query.limit.call_count, len(pages))
+        mock_query.limit.assert_called_with(1000)
+        MockEvaluationResult.create_time.__gt__.assert_called_with(4999)
+        MockEvaluationResult.id.__gt__.assert_called_with("r4999")
+
+    @patch("api.db.services.evaluation.report_service.EvaluationRun")
+    @patch("api.db.services.evaluation.report_service.EvaluationResult")
+    @patch("api.db.services.evaluation.report_service.EvaluationCase")
+    def test_iter_run_results_csv_query_error(self, MockEvaluationCase, MockEvaluationResult, MockEvaluationRun):
+        MockEvaluationRun.get_by_id.return_value = MagicMock()
+        MockEvaluationResult.select.side_effect = RuntimeError("db down")
+
+        with patch.object(EvaluationReportService, "_metric_keys_for_run", return_value=set()):
+            chunks = EvaluationService.iter_run_results_csv("run_123")
+        self.assertIsNotNone(chunks)
+
+        # The first chunk runs the query, so the failure reaches the caller before any output
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(RuntimeError):
+                next(chunks)
+
+    @patch("api.db.services.evaluation.report_service.EvaluationResult")
+    def test_metric_keys_for_run_union(self, MockEvaluationResult):
+        # Not PostgreSQL here, so the keys are merged from a single streamed pass
+        rows = [SimpleNamespace(metrics={"precision": 1.0, "recall": 0.5}), SimpleNamespace(metrics={}), SimpleNamespace(metrics={"f1_score": 0.0})]
+        MockEvaluationResult.select.return_value.where.return_value.iterator.return_value = iter(rows)
+
+        keys = EvaluationReportService._metric_keys_for_run("run_123")
+
+        self.assertEqual(keys, {"precision", "recall", "f1_score"})
+
+    @patch("common.settings.DATABASE_TYPE", "postgres")
+    @patch("api.db.services.evaluation.report_service.DB")
+    def test_metric_keys_for_run_postgres(self, MockDB):
+        MockDB.execute_sql.return_value.fetchall.return_value = [("precision",), ("recall",)]
+
+        keys = EvaluationReportService._metric_keys_for_run("run_123")
+
+        self.assertEqual(keys, {"precision", "recall"})
+        sql, params = MockDB.execute_sql.call_args.args
+        self.assertIn("DISTINCT jsonb_object_keys", sql)
+        self.assertEqual(params, ("run_123",))
+
+    @patch("api.db.services.evaluation.report_service.EvaluationRun")
+    @patch("api.db.services.evaluation.report_service.EvaluationResult")
+    @patch("api.db.services.evaluation.report_service.EvaluationCase")
+    def test_metric_keys_cached_for_finished_run(self, MockEvaluationCase, MockEvaluationResult, MockEvaluationRun):
+        _cached_metric_keys.cache_clear()
+        self.addCleanup(_cached_metric_keys.cache_clear)
+        mock_run = SimpleNamespace(status="COMPLETED", update_time=1000, complete_time=1000)
+        MockEvaluationRun.get_by_id.return_value = mock_run
+        MockEvaluationResult.select.return_value.join.return_value.where.return_value.order_by.return_value.limit.return_value.dicts.return_value.iterator.side_effect = lambda: iter([])
+
+        with patch.object(EvaluationReportService, "_metric_keys_for_run", return_value={"precision"}) as mock_keys:
+            first = EvaluationService.get_run_results_csv("run_123")
+            second = EvaluationService.get_run_results_csv("run_123")
+            self.assertEqual(mock_keys.call_count, 1)
+            self.assertEqual(first, second)
+            self.assertIn("metric_precision", first)
+
+            # An updated run row gets a new cache key
+            mock_run.update_time = 2000
+            EvaluationService.get_run_results_csv("run_123")
+            self.assertEqual(mock_keys.call_count, 2)
+
+    @patch("api.db.services.evaluation.report_service.EvaluationRun")
+    def test_iter_run_results_csv_missing_run(self, MockEvaluationRun):
+        MockEvaluationRun.get_by_id.return_value = None
+        self.assertIsNone(EvaluationService.iter_run_results_csv("missing"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -19,69 +19,77 @@ Unit tests for EvaluationService and EvaluationMetricsService.
 
 import sys
 import pytest
-from unittest.mock import MagicMock, patch
-
-# Define the patch dict globally or in a fixture
-# We need to make sure we cover all imports that might fail or need mocking
-
-
-@pytest.fixture
+from unittest.mock import MagicMock
+
+from test.mocks.mock_utils import patch_modules
+
+# Modules imported against the stubs below; dropped so each import binds to this module's stubs
+_EVALUATION_MODULES = (
+    "api.db.services.evaluation_service",
+    "api.db.services.evaluation.dataset_service",
+    "api.db.services.evaluation.metrics_service",
+    "api.db.services.evaluation.report_service",
+    "api.db.services.evaluation.runner_service",
+)
+
+
+# Stub modules for the evaluation services, built once at import. Modules that only need
+# to satisfy imports share one stub; the rest are configured below or by the tests.
+_MODULE_STUB = MagicMock()
+_MOCKS = {
+    "api.db.services.dialog_service": _MODULE_STUB,
+    "api.db.db_models": MagicMock(),
+    "api.db.services.common_service": MagicMock(CommonService=object),
+    "common.constants": MagicMock(),
+    "common.misc_utils": _MODULE_STUB,
+    "common.time_utils": _MODULE_STUB,
+    "api.db.services.llm_service": MagicMock(),
+    "api.db.services.tenant_llm_service": MagicMock(),
+    "rag.prompts.template": MagicMock(),
+    "rag.prompts.generator": MagicMock(),
+    "json_repair": MagicMock(),
+    "api.utils.api_utils": _MODULE_STUB,
+    "quart": _MODULE_STUB,
+}
+_MOCKS["common.constants"].LLMType.IMAGE2TEXT = "image2text"
+_MOCKS["common.constants"].LLMType.CHAT = "chat"
+_MOCKS["rag.prompts.generator"].PROMPT_JINJA_ENV.from_string.return_value.render.return_value = "Rendered Prompt"
+_MOCKS["rag.prompts.generator"].message_fit_in.return_value = (100, [{"role": "user", "content": "Rendered Prompt"}])
+_MOCKS["api.db.services.llm_service"].LLMBundle.return_value.max_length = 4096
+
+
+@pytest.fixture(scope="module")
 def mock_env():
-    # Create mocks
-    mock_dialog_service = MagicMock()
-    mock_db_models = MagicMock()
-
-    mock_common_service = MagicMock()
-    mock_common_service.CommonService = object
-
-    mock_constants = MagicMock()
-    mock_constants.LLMType.IMAGE2TEXT = "image2text"
-    mock_constants.LLMType.CHAT = "chat"
-
-    mock_llm_service = MagicMock()
-    mock_tenant_llm_service = MagicMock()
-    mock_template = MagicMock()
-    mock_generator = MagicMock()
-    mock_json_repair = MagicMock()
-
-    # Mock quart and api_utils for other tests
-    mock_api_utils = MagicMock()
-    mock_quart = MagicMock()
-
-    # Config generator
-    mock_generator.PROMPT_JINJA_ENV.from_string.return_value.render.return_value = "Rendered Prompt"
-    mock_generator.message_fit_in.return_value = (100, [{"role": "user", "content": "Rendered Prompt"}])
-
-    # Config LLM Service
-    mock_bundle_instance = mock_llm_service.LLMBundle.return_value
-    mock_bundle_instance.max_length = 4096
-
-    # Patch dictionary
-    patches = {
-        "api.db.services.dialog_service": mock_dialog_service,
-        "api.db.db_models": mock_db_models,
-        "api.db.services.common_service": mock_common_service,
-        "common.constants": mock_constants,
-        "common.misc_utils": MagicMock(),
-        "common.time_utils": MagicMock(),
-        "api.db.services.llm_service": mock_llm_service,
-        "api.db.services.tenant_llm_service": mock_tenant_llm_service,
-        "rag.prompts.template": mock_template,
-        "rag.prompts.generator": mock_generator,
-        "json_repair": mock_json_repair,
-        "api.utils.api_utils": mock_api_utils,
-        "quart": mock_quart,
-    }
-
-    with patch.dict(sys.modules, patches):
-        # We also need to remove evaluation_service from sys.modules if it exists
-        # to force re-import with mocked dependencies
-        if "api.db.services.evaluation_service" in sys.modules:
-            del sys.modules["api.db.services.evaluation_service"]
-        if "api.db.services.evaluation.metrics_service" in sys.modules:
-            del sys.modules["api.db.services.evaluation.metrics_service"]
-
-        yield {"llm_service": mock_llm_service, "tenant_llm_service": mock_tenant_llm_service, "template": mock_template, "json_repair": mock_json_repair, "db_models": mock_db_models}
+    """Install the stub modules and import the evaluation services against them once for this module."""
+    # Set aside copies other test modules imported at collection time so the services bind to
+    # these stubs, and put them back afterwards for those modules' tests
+    saved = {name: sys.modules.pop(name) for name in _EVALUATION_MODULES if name in sys.modules}
+
+    with patch_modules(_MOCKS, purge=_EVALUATION_MODULES):
+        yield {
+            "llm_service": _MOCKS["api.db.services.llm_service"],
+            "tenant_llm_service": _MOCKS["api.db.services.tenant_llm_service"],
+            "template": _MOCKS["rag.prompts.template"],
+            "json_repair": _MOCKS["json_repair"],
+            "db_models": _MOCKS["api.db.db_models"],
+        }
+
+    for name, module in saved.items():
+        sys.modules[name] = module
+        parent, _, child = name.rpartition(".")
+        setattr(sys.modules[parent], child, module)
+
+
+@pytest.fixture(autouse=True)
+def reset_mocks(mock_env):
+    """Clear the state tests configure on the shared stubs, leaving the module-wide setup intact."""
+    yield
+    bundle = mock_env["llm_service"].LLMBundle
+    bundle.reset_mock()
+    bundle.return_value.chat.reset_mock(return_value=True, side_effect=True)
+    mock_env["tenant_llm_service"].reset_mock(return_value=True)
+    mock_env["json_repair"].loads.reset_mock(return_value=True, side_effect=True)
+    mock_env["db_models"].reset_mock(return_value=True)
 
 
 def test_evaluate_with_llm(mock_env):
@@ -143,22 +151,12 @@ class TestEvaluationCompareRuns:
         # Arrange
         run_ids = ["run1", "run2"]
 
-        run1 = MagicMock()
-        run1.id = "run1"
-        run1.dataset_id_id = "ds1"  # Peewee FK usage
-        run1.metrics_summary = {"avg_precision": 0.8, "avg_recall": 0.6}
-        run1.to_dict.return_value = {"id": "run1", "dataset_id": "ds1", "metrics_summary": {"avg_precision": 0.8, "avg_recall": 0.6}}
-
-        run2 = MagicMock()
-        run2.id = "run2"
-        run2.dataset_id_id = "ds1"
-        run2.metrics_summary = {"avg_precision": 0.9, "avg_recall": 0.5}
-        run2.to_dict.return_value = {"id": "run2", "dataset_id": "ds1", "metrics_summary": {"avg_precision": 0.9, "avg_recall": 0.5}}
+        # Rows as returned by .dicts(): FK columns are keyed by field name
+        run1 = {"id": "run1", "dataset_id": "ds1", "metrics_summary": {"avg_precision": 0.8, "avg_recall": 0.6}}
+        run2 = {"id": "run2", "dataset_id": "ds1", "metrics_summary": {"avg_precision": 0.9, "avg_recall": 0.5}}
 
-        # Mock the query chain: EvaluationRun.select().where()
-        mock_query = MagicMock()
-        mock_query.__iter__.return_value = [run1, run2]
-        mock_evaluation_run.select.return_value.where.return_value = mock_query
+        # Mock the query chain: EvaluationRun.select().where().dicts().iterator()
+        mock_evaluation_run.select.return_value.where.return_value.dicts.return_value.iterator.return_value = iter([run1, run2])
 
         # Act
         success, result = EvaluationService.compare_runs(run_ids)
@@ -166,7 +164,7 @@ class TestEvaluationCompareRuns:
         # Assert
         assert success is True
         assert "runs" in result
-        assert len(result["runs"]) == 2
+        assert result["runs"] == [run1, run2]
         assert "comparison" in result
 
         # Check if pivoted metrics are correct
@@ -187,15 +185,9 @@ class TestEvaluationCompareRuns:
 
         run_ids = ["run1", "run2"]
 
-        run1 = MagicMock()
-        run1.id = "run1"
-        run1.dataset_id_id = "ds1"
-
         # Only return run1
-        mock_query = MagicMock()
-        mock_query.__iter__.return_value = [run1]
-
-        mock_evaluation_run.select.return_value.where.return_value = mock_query
+        run1 = {"id": "run1", "dataset_id": "ds1", "metrics_summary": None}
+        mock_evaluation_run.select.return_value.where.return_value.dicts.return_value.iterator.return_value = iter([run1])
 
         success, result = EvaluationService.compare_runs(run_ids)
 
@@ -209,18 +201,10 @@ class TestEvaluationCompareRuns:
         mock_evaluation_run = mock_env["db_models"].EvaluationRun
         run_ids = ["run1", "run2"]
 
-        run1 = MagicMock()
-        run1.id = "run1"
-        run1.dataset_id_id = "ds1"
-
-        run2 = MagicMock()
-        run2.id = "run2"
-        run2.dataset_id_id = "ds2"  # Different dataset
-
-        mock_query = MagicMock()
-        mock_query.__iter__.return_value = [run1, run2]
+        run1 = {"id": "run1", "dataset_id": "ds1", "metrics_summary": None}
+        run2 = {"id": "run2", "dataset_id": "ds2", "metrics_summary": None}  # Different dataset
 
-        mock_evaluation_run.select.return_value.where.return_value = mock_query
+        mock_evaluation_run.select.return_value.where.return_value.dicts.return_value.iterator.return_value = iter([run1, run2])
 
         success, result = EvaluationService.compare_runs(run_ids)
 